@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bench_fixtures
+import page_cache
+from phases import PHASES, timing
+from database import player_seasons_table, PLAYER_SEASONS_INDEX, SEASON_COLUMNS
+from season_stats import LAST_SEASON, STAT_FIELDS, parse_season_table
+
+# latency of each slash command against recorded (or generated) pages and a throwaway database, no network needed
+# the baseline records which kind of pages it was measured on and is only compared with runs on the same kind
+# every command runs 'cold' (page cache emptied first, so it downloads and parses everything it needs) and 'warm'
+# (pages and parsed tables already in memory, which is what the refresh scheduler keeps it at in production)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+RUNS = 30
+# a p95 can grow by this fraction (plus MIN_SLACK_MS, for phases that take almost no time) before it counts as a regression
+TOLERANCE = 0.25
+MIN_SLACK_MS = 5.0
+# parsing (lxml on a worker thread) varies more from run to run than the rest, so phases it dominates get more room
+PARSE_TOLERANCE = 0.5
+# below this many runs the p95 is one of the two slowest runs, so a single slow run (gc, another process) fails the check
+# fewer runs still print their percentiles but aren't compared with the baseline
+MIN_GATE_RUNS = 20
+PERCENTILES = (50, 95, 99)
+CALIBRATION_RUNS = 9
+
+BOARD_OWNER = 1001
+NEW_USER = 1002
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.name = f"bench{user_id}"
+
+
+# what a command sent, so a run that ended in an error message isn't counted as a normal run
+class FakeMessage:
+    def __init__(self, content=None, embed=None, view=None):
+        self.content = content
+        self.embed = embed
+        self.view = view
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def defer(self, **kwargs):
+        self.done = True
+
+    async def send_message(self, content=None, embed=None, view=None, **kwargs):
+        self.done = True
+        self.interaction.sent.append(FakeMessage(content, embed, view))
+
+    async def edit_message(self, content=None, embed=None, view=None, **kwargs):
+        await self.send_message(content, embed, view)
+
+    async def send_modal(self, modal):
+        await self.send_message(view=modal)
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, embed=None, view=None, **kwargs):
+        self.interaction.sent.append(FakeMessage(content, embed, view))
+
+
+# stands in for discord.Interaction, only what the commands use
+class FakeInteraction:
+    def __init__(self, user_id):
+        self.user = FakeUser(user_id)
+        self.guild = None
+        self.channel = None
+        self.channel_id = None
+        self.message = None
+        self.data = {}
+        self.sent = []
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+
+# player_seasons and schedules for the generated players, the same tables get_lastyear.py and get_schedule.py build
+def build_database(path):
+    with sqlite3.connect(path) as storage:
+        storage.execute(player_seasons_table('player_seasons'))
+        storage.execute(PLAYER_SEASONS_INDEX)
+        for position, players in bench_fixtures.PLAYERS.items():
+            storage.executemany(
+                f"INSERT INTO player_seasons VALUES ({', '.join('?' for _ in range(3 + len(SEASON_COLUMNS)))})",
+                [(name, LAST_SEASON, position, team, i + 1, 17, round(20 - i * 0.1, 1), *[i * j for j in range(1, len(STAT_FIELDS) + 1)])
+                 for i, (name, team) in enumerate(players)]
+            )
+        storage.execute('''
+            CREATE TABLE schedules (home_team TEXT, away_team TEXT, time TEXT, date TEXT, week TEXT, id INTEGER PRIMARY KEY AUTOINCREMENT)
+        ''')
+        teams = ['JAX' if team == 'JAC' else team for team in bench_fixtures.TEAMS]
+        for week in range(1, 18):
+            rotated = teams[week % len(teams):] + teams[:week % len(teams)]
+            storage.executemany(
+                "INSERT INTO schedules (home_team, away_team, time, date, week) VALUES (?, ?, ?, ?, ?)",
+                [(rotated[i], rotated[i + 1], '1:00 PM', f"Sunday, September {week}", f"Week {week}") for i in range(0, len(rotated), 2)]
+            )
+
+
+# (name, command, arguments, user, what a successful run sends)
+def scenarios(bot):
+    week = str(bench_fixtures.BENCH_WEEK)
+    return [
+        ('start_or_sit', bot.start_or_sit, {'player1': 'Wr Player 001', 'player2': 'Rb Player 002', 'week': week}, BOARD_OWNER, 'embed'),
+        ('current_stats', bot.current_stats, {'player': 'Wr Player 005'}, BOARD_OWNER, 'embed'),
+        ('last_season_stats', bot.last_season_stats, {'player': 'Qb Player 003'}, BOARD_OWNER, 'embed'),
+        ('trade_analyzer', bot.trade_analyzer, {'giving1': 'Wr Player 010', 'giving2': 'Rb Player 004',
+                                                'receiving1': 'Qb Player 002', 'receiving2': 'Te Player 001'}, BOARD_OWNER, 'embed'),
+        ('breaking_news', bot.breaking_news, {}, BOARD_OWNER, 'embed'),
+        ('waiver_wire_report', bot.waiver_wire_report, {'position': None, 'page': 1}, BOARD_OWNER, 'embed'),
+        ('create_draftboard', bot.create_draftboard, {}, NEW_USER, 'view'),
+        ('manage_draftboard', bot.manage_draftboard, {}, BOARD_OWNER, 'view'),
+    ]
+
+
+# which pages the benchmark runs against: generated pages are built to the layouts the parsers were written for,
+# so they measure speed but say nothing about whether the parsers still read the real sites correctly
+def fixture_kind():
+    recorded = [bench_fixtures.recorded(url) for url in bench_fixtures.FIXTURES]
+    if all(recorded):
+        return 'recorded'
+    return 'mixed' if any(recorded) else 'generated'
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+# seconds for fixed pieces of work, used to scale the baseline to the machine running the benchmark
+# lxml parsing on a worker thread doesn't get faster or slower in step with pure python, so it is measured on its own
+# by parsing a generated season page the way /current_stats does
+# the median is used rather than the fastest run, one lucky run would otherwise shrink the whole baseline
+def calibrate():
+    page = bench_fixtures.season_page('WR')
+    python = []
+    parse = []
+    with ThreadPoolExecutor(1) as executor:
+        for _ in range(CALIBRATION_RUNS):
+            start = time.perf_counter()
+            sum(i * i for i in range(300_000))
+            python.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            executor.submit(parse_season_table, page, 'WR').result()
+            parse.append(time.perf_counter() - start)
+    return {'python': percentile(python, 50), 'parse': percentile(parse, 50)}
+
+
+async def run_scenario(command, arguments, user_id, expect, runs, cold):
+    samples = {phase: [] for phase in PHASES + ('total',)}
+    errors = []
+    for run in range(runs + 1):
+        if cold:
+            for source in list(page_cache.SOURCES) + [page_cache.DEFAULT_SOURCE]:
+                page_cache.pages.flush(source)
+        interaction = FakeInteraction(user_id)
+        with timing(command.name) as timer:
+            await command.callback(interaction, **arguments)
+
+        last = interaction.sent[-1] if interaction.sent else None
+        if last is None or getattr(last, expect) is None:
+            errors.append(last.content if last else 'nothing sent')
+        # the first run only warms up imports and connections
+        if run == 0:
+            continue
+        for phase, seconds in timer.breakdown().items():
+            samples[phase].append(seconds * 1000)
+        samples['total'].append(timer.total() * 1000)
+    return {phase: {f"p{p}": percentile(values, p) for p in PERCENTILES} for phase, values in samples.items()}, errors
+
+
+async def run_all(runs):
+    import bot
+    from board_repository import boards, template
+    from database import db
+    from news_feed import news_feed
+
+    fixtures = {url: bench_fixtures.load_fixture(url) for url in bench_fixtures.FIXTURES}
+
+    # the page cache downloads through this instead of the network, decoding gives each download its own string like a real one
+    async def fetch_fixture(url):
+        return fixtures[url].decode()
+    page_cache.fetch_text = fetch_fixture
+
+    results = {}
+    failures = {}
+    with tempfile.TemporaryDirectory() as directory:
+        db.path = os.path.join(directory, 'draft_board.db')
+        build_database(db.path)
+        await db.connect()
+        try:
+            await bot.load_player_index()
+            await bot.load_schedule_index()
+            await template.load()
+            await news_feed.load()
+            await boards.save(BOARD_OWNER, 'bench', '01/01/2024 00:00:00', template.new_board())
+
+            for name, command, arguments, user_id, expect in scenarios(bot):
+                for mode in ('cold', 'warm'):
+                    key = f"{name} {mode}"
+                    results[key], errors = await run_scenario(command, arguments, user_id, expect, runs, mode == 'cold')
+                    if errors:
+                        failures[key] = errors[0]
+        finally:
+            await db.close()
+    return results, failures
+
+
+def print_results(results):
+    print(f"{'command':<26} {'phase':<9} " + " ".join(f"{f'p{p} ms':>9}" for p in PERCENTILES))
+    for key, phases in results.items():
+        for phase in ('total',) + PHASES:
+            values = phases[phase]
+            if phase != 'total' and values['p99'] < 0.05:
+                continue
+            print(f"{key if phase == 'total' else '':<26} {phase:<9} " + " ".join(f"{values[f'p{p}']:>9.2f}" for p in PERCENTILES))
+
+
+# the parse phase, and totals that were mostly parsing when the baseline was saved
+def parse_bound(phase, phases):
+    return phase == 'parse' or (phase == 'total' and phases.get('parse', {}).get('p95', 0) > phases['total']['p95'] / 2)
+
+
+# p95s that grew past the tolerance, after scaling the baseline by how fast this machine is
+def regressions(results, baseline, tolerance, calibration):
+    scales = {kind: calibration[kind] / baseline['calibration'][kind] for kind in calibration}
+    found = []
+    for key, phases in results.items():
+        before_phases = baseline['results'].get(key, {})
+        for phase, values in phases.items():
+            before = before_phases.get(phase)
+            if before is None:
+                continue
+            if parse_bound(phase, before_phases):
+                scale, allowed_growth = scales['parse'], max(tolerance, PARSE_TOLERANCE)
+            else:
+                scale, allowed_growth = scales['python'], tolerance
+            allowed = before['p95'] * scale * (1 + allowed_growth) + MIN_SLACK_MS
+            if values['p95'] > allowed:
+                found.append(f"{key} {phase}: p95 {values['p95']:.2f} ms, baseline {before['p95'] * scale:.2f} ms")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every command against page fixtures")
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--save-baseline', action='store_true', help=f"store these results as the baseline in {os.path.basename(BASELINE)}")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    kind = fixture_kind()
+    calibration = calibrate()
+    results, failures = asyncio.run(run_all(args.runs))
+    print(f"{args.runs} runs against {kind} pages")
+    print_results(results)
+
+    for key, error in failures.items():
+        print(f"FAILED {key}: {error}")
+
+    if args.save_baseline:
+        if args.runs < MIN_GATE_RUNS:
+            sys.exit(f"a baseline needs at least {MIN_GATE_RUNS} runs")
+        with open(BASELINE, 'w') as baseline_file:
+            json.dump({'calibration': calibration, 'runs': args.runs, 'pages': kind, 'results': results}, baseline_file, indent=1, sort_keys=True)
+        print(f"saved baseline to {BASELINE}")
+    elif os.path.exists(BASELINE):
+        with open(BASELINE) as baseline_file:
+            baseline = json.load(baseline_file)
+        if args.runs < MIN_GATE_RUNS:
+            print(f"not compared with the baseline, regressions are only checked with --runs {MIN_GATE_RUNS} or more")
+        elif baseline.get('pages', 'generated') != kind:
+            print(f"not compared with the baseline, it was measured on {baseline.get('pages', 'generated')} pages "
+                  f"and these are {kind}, save a new one with --save-baseline")
+        else:
+            scales = ", ".join(f"{kind} x{calibration[kind] / baseline['calibration'][kind]:.2f}" for kind in calibration)
+            print(f"baseline scaled to this machine: {scales}")
+            found = regressions(results, baseline, args.tolerance, calibration)
+            for regression in found:
+                print(f"REGRESSION {regression}")
+            if found:
+                sys.exit(1)
+            print("no regressions against the baseline")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
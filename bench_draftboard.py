@@ -0,0 +1,37 @@
+import random
+import sys
+import timeit
+from ranked_board import RankedBoard
+
+# board sizes to compare, from the standard 150 player board up to deep dynasty boards
+BOARD_SIZES = [150, 300, 500, 1000, 5000, 20000]
+ITEMS_PER_PAGE = 12
+OPERATIONS = 5000
+
+
+# average microseconds per call of operation over OPERATIONS random calls
+def time_operation(operation, size):
+    arguments = iter([(random.randrange(size), random.randrange(size)) for _ in range(OPERATIONS)])
+    seconds = timeit.timeit(lambda: operation(*next(arguments)), number=OPERATIONS)
+    return seconds / OPERATIONS * 1_000_000
+
+
+# builds the text of the page a position is on, the same way the draft board views do
+def render(board):
+    def render_page(index, _):
+        start = index - index % ITEMS_PER_PAGE
+        return "\n".join(f"{i + 1}. {player[0]}" for i, player in board.page(start, ITEMS_PER_PAGE))
+    return render_page
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    print(f"{'size':>6} {'move us':>9} {'swap us':>9} {'render us':>10} {'board KB':>9}")
+    for size in BOARD_SIZES:
+        # rows are shared with the starting template, so a board only owns its list of pointers
+        board = RankedBoard((f"Player {i}",) for i in range(size))
+        move = time_operation(board.move, size)
+        swap = time_operation(board.swap, size)
+        page = time_operation(render(board), size)
+        memory = sys.getsizeof(board.players) / 1024
+        print(f"{size:>6} {move:>9.2f} {swap:>9.2f} {page:>10.2f} {memory:>9.1f}")
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import re
+import sys
+from http_client import fetch_text, close_session
+from projections import ROS_URL
+from season_stats import SEASON_STATS_URL, CURRENT_SEASON
+from refresh_scheduler import NEWS_URL, TRENDS_URL
+from weekly_projections import projections_url, boom_bust_url
+
+# recorded pages live here, one file per url, and are used instead of the generated pages whenever they exist
+# generated pages are synthetic: they follow the layouts the parsers were written against, so they time the parsers
+# but can't show that the parsers still read the real sites, only recorded pages (--record) can
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TEAMS = ['ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE', 'DAL', 'DEN', 'DET', 'GB', 'HOU', 'IND', 'JAC', 'KC',
+         'LV', 'LAC', 'LAR', 'MIA', 'MIN', 'NE', 'NO', 'NYG', 'NYJ', 'PHI', 'PIT', 'SF', 'SEA', 'TB', 'TEN', 'WAS']
+
+# players generated for each position, names are unique substrings of each other so name searches find one player
+PLAYER_COUNTS = {'QB': 40, 'RB': 80, 'WR': 110, 'TE': 50}
+PLAYERS = {
+    position: [(f"{position.title()} Player {i:03d}", TEAMS[i % len(TEAMS)]) for i in range(1, count + 1)]
+    for position, count in PLAYER_COUNTS.items()
+}
+
+# cbssports column groups for each position, as they appear in the two header rows of the season tables
+SEASON_COLUMNS = {
+    'QB': [('', ['Player', 'GP']), ('Passing', ['ATT', 'CMP', 'YDS', 'YD/ATT', 'TD', 'INT', 'RATE']),
+           ('Rushing', ['ATT', 'YDS', 'AVG', 'TD']), ('Misc', ['FL']), ('Fantasy', ['FPTS', 'FPPG'])],
+    'RB': [('', ['Player', 'GP']), ('Rushing', ['ATT', 'YDS', 'AVG', 'TD']),
+           ('Receiving', ['TGT', 'REC', 'YDS', 'YD/REC', 'LNG', 'TD']), ('Misc', ['FL']), ('Fantasy', ['FPTS', 'FPPG'])],
+    'WR': [('', ['Player', 'GP']), ('Receiving', ['TGT', 'REC', 'YDS', 'YD/REC', 'LNG', 'TD']),
+           ('Rushing', ['ATT', 'YDS', 'AVG', 'TD']), ('Misc', ['FL']), ('Fantasy', ['FPTS', 'FPPG'])],
+    'TE': [('', ['Player', 'GP']), ('Receiving', ['TGT', 'REC', 'YDS', 'YD/REC', 'LNG', 'TD']),
+           ('Misc', ['FL']), ('Fantasy', ['FPTS', 'FPPG'])],
+}
+
+# cells in a fantasypros weekly projection row, the projected points are the last one
+PROJECTION_WIDTHS = {'qb': 11, 'rb': 9, 'wr': 9, 'te': 6}
+BENCH_WEEK = 1
+
+# site chrome around every table: navigation, inline scripts and ad slots, which is most of a real page's size
+FILLER = "<nav><ul>" + "".join(
+    f"<li class='nav-item'><a href='/link/{i}'>Link {i}</a></li><script>var slot{i} = {{id: {i}, sizes: [[300, 250]]}};</script>"
+    for i in range(1000)
+) + "</ul></nav>" + "".join(f"<div class='ad-slot'><a href='/promo/{i}'>Promo {i}</a></div>" for i in range(500))
+
+
+def page(body, title):
+    return f"<!DOCTYPE html><html><head><title>{title}</title></head><body>{FILLER}{body}{FILLER}</body></html>"
+
+
+def season_page(position):
+    groups = SEASON_COLUMNS[position]
+    width = sum(len(columns) for _, columns in groups)
+    head = ("<tr>" + "".join(f"<th class='TableBase-headTh' colspan='{len(columns)}'>{group}</th>" for group, columns in groups) + "</tr>"
+            + "<tr>" + "".join(f"<th class='TableBase-headTh'>{column}</th>" for _, columns in groups for column in columns) + "</tr>")
+    rows = []
+    for i, (name, team) in enumerate(PLAYERS[position]):
+        player_cell = (f"<td class='TableBase-bodyTd'><span class='CellPlayerName--long'><span><a href='/players/{i}'>{name}</a>\n"
+                       f"<span class='CellPlayerName-position'>{position}</span> <span class='CellPlayerName-team'>{team}</span></span></span></td>")
+        values = [str(17 - i % 5)] + [f"{(i * 7 + j * 13) % 300}" for j in range(width - 4)] + [f"{300 - i:.1f}", f"{(300 - i) / 17:.1f}"]
+        rows.append("<tr class='TableBase-bodyTr'>" + player_cell + "".join(
+            f"<td class='TableBase-bodyTd TableBase-bodyTd--number'>{value}</td>" for value in values) + "</tr>")
+    return page(f"<table class='TableBase-table'><thead>{head}</thead><tbody>{''.join(rows)}</tbody></table>", f"{position} Stats")
+
+
+def projections_page(position):
+    width = PROJECTION_WIDTHS[position]
+    rows = "".join(
+        f"<tr><td class='player-label'><a class='player-name'>{name}</a> {team}</td>"
+        + "".join(f"<td class='center'>{(i * 3 + j) % 40}.{j}</td>" for j in range(width - 2))
+        + f"<td class='center'>{25 - i * 0.1:.1f}</td></tr>"
+        for i, (name, team) in enumerate(PLAYERS[position.upper()])
+    )
+    return page(f"<table id='data'><tbody>{rows}</tbody></table>", f"{position} projections")
+
+
+def boom_bust_page(position):
+    rows = "".join(
+        f"<tr><td>{i + 1}</td><td>{name} {team}</td><td>{30 - i % 20}.0%</td><td>{10 + i % 15}.0%</td><td>{50 + i % 30}%</td></tr>"
+        for i, (name, team) in enumerate(PLAYERS[position.upper()])
+    )
+    return page(f"<table><tbody>{rows}</tbody></table>", f"{position} boom bust")
+
+
+def ros_page():
+    players = [(name, position, team) for position, names in PLAYERS.items() for name, team in names]
+    rows = "".join(
+        f"<tr><td class='player'><span class='full'>{name}</span><span class='abbrev'>{name[:1]}.</span> ({position}, {team})</td>"
+        f"<td class='nf_fp active'>{200 - i % 150}.5</td><td class='rec'>{i % 90}.0</td><td>other</td></tr>"
+        for i, (name, position, team) in enumerate(players)
+    )
+    return page(f"<table class='projection-table'><tbody>{rows}</tbody></table>", "Remaining projections")
+
+
+def news_page(items=50):
+    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    news = "".join(
+        f"<div class='player-news-item'><div class='player-news-header'>Wr Player {i + 1:03d} news {days[i % 7]}, Sep {i % 28 + 1}th {i % 12 + 1}:0{i % 10}pm</div>"
+        f"<p>Something happened to him in practice. Fantasy Impact: impact {i}</p></div>"
+        for i in range(items)
+    )
+    return page(news, "Breaking news")
+
+
+def trends_page():
+    players = [(name, position, team) for position, names in PLAYERS.items() for name, team in names[:10]]
+    rows = "".join(
+        f"<tr><td class='playerNameAndInfo'><a>{name}</a> <em>{position} - {team}</em> View News</td><td>+{i}</td><td>{40 + i}%</td>"
+        f"<td>+{i}</td><td>{20 + i}%</td><td></td><td></td><td></td></tr>"
+        for i, (name, position, team) in enumerate(players)
+    )
+    return page(f"<table class='tableType-player'><tbody>{rows}</tbody></table>", "Trends")
+
+
+# every url the bot scrapes (weekly projections only for BENCH_WEEK) and how to generate a stand-in for it
+FIXTURES = {
+    NEWS_URL: news_page,
+    TRENDS_URL: trends_page,
+    ROS_URL: ros_page,
+    **{SEASON_STATS_URL.format(position=position, year=CURRENT_SEASON): (lambda position=position: season_page(position)) for position in SEASON_COLUMNS},
+    **{boom_bust_url(position): (lambda position=position: boom_bust_page(position)) for position in PROJECTION_WIDTHS},
+    **{projections_url(position, BENCH_WEEK): (lambda position=position: projections_page(position)) for position in PROJECTION_WIDTHS},
+}
+
+
+def fixture_path(url):
+    return os.path.join(FIXTURE_DIR, re.sub(r'[^A-Za-z0-9]+', '_', url.split('://', 1)[1]).strip('_') + '.html')
+
+
+# a fixture's html as bytes, recorded if there's a recording and generated otherwise
+def load_fixture(url):
+    path = fixture_path(url)
+    if os.path.exists(path):
+        with open(path, 'rb') as fixture:
+            return fixture.read()
+    return FIXTURES[url]().encode()
+
+
+def recorded(url):
+    return os.path.exists(fixture_path(url))
+
+
+# downloads every fixture url and saves it, so benchmarks run against real pages from then on
+async def record():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    try:
+        for url in FIXTURES:
+            try:
+                html = await fetch_text(url)
+            except Exception as e:
+                print(f"failed  {url}: {e}")
+                continue
+            with open(fixture_path(url), 'w', encoding='utf-8') as fixture:
+                fixture.write(html)
+            print(f"saved   {url} ({len(html) / 1024:.0f} KB)")
+    finally:
+        await close_session()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--record']:
+        asyncio.run(record())
+    else:
+        for url in FIXTURES:
+            print(f"{'recorded ' if recorded(url) else 'generated'} {len(load_fixture(url)) / 1024:>6.0f} KB  {url}")
@@ -0,0 +1,48 @@
+import timeit
+import tracemalloc
+from bs4 import BeautifulSoup
+import parsing
+from parsing import parse, SEASON_TABLE, ROS_TABLE, NEWS_ITEMS, TABLE_ROWS
+from bench_fixtures import load_fixture
+from projections import ROS_URL
+from season_stats import SEASON_STATS_URL, CURRENT_SEASON
+from refresh_scheduler import NEWS_URL, TRENDS_URL
+
+RUNS = 5
+
+# (page, strainer, element the scraper looks for) for each scraped page, from the same fixtures as bench_commands.py
+PAGES = {
+    'season_stats': (load_fixture(SEASON_STATS_URL.format(position='WR', year=CURRENT_SEASON)).decode(), SEASON_TABLE, ("td", "TableBase-bodyTd")),
+    'ros_projections': (load_fixture(ROS_URL).decode(), ROS_TABLE, ("td", "nf_fp active")),
+    'news': (load_fixture(NEWS_URL).decode(), NEWS_ITEMS, ("div", "player-news-item")),
+    'trends': (load_fixture(TRENDS_URL).decode(), TABLE_ROWS, ("td", None)),
+}
+
+# the parser the bot used before (whole page with html.parser) against the whole page and the strained page with lxml
+METHODS = {
+    'html.parser': lambda html, only: BeautifulSoup(html, "html.parser"),
+    'lxml': lambda html, only: BeautifulSoup(html, "lxml"),
+    'lxml strained': lambda html, only: parse(html, only),
+}
+
+
+# average milliseconds and peak megabytes to parse a page and find the scraper's elements
+def measure(method, html, only, element):
+    name, attrs = element
+    run = lambda: method(html, only).find_all(name, attrs=attrs)
+    found = len(run())
+    seconds = timeit.timeit(run, number=RUNS) / RUNS
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds * 1000, peak / 1024 / 1024, found
+
+
+if __name__ == '__main__':
+    print(f"bot parser: {parsing.PARSER}")
+    print(f"{'page':<16} {'KB':>6} {'method':<14} {'ms':>8} {'peak MB':>8} {'found':>6}")
+    for page, (html, only, element) in PAGES.items():
+        for method_name, method in METHODS.items():
+            ms, peak, found = measure(method, html, only, element)
+            print(f"{page:<16} {len(html) / 1024:>6.0f} {method_name:<14} {ms:>8.1f} {peak:>8.1f} {found:>6}")
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from database import db
+
+# how many users' boards are kept in memory
+MAX_CACHED_BOARDS = 512
+
+# marks users known not to have a saved board, so repeated checks don't hit the database either
+NO_BOARD = ()
+
+
+# draft boards by user with a bounded LRU cache in front of the database
+# saves and deletes write through, so the cache never holds an out of date board
+class DraftBoardRepository:
+    def __init__(self, max_entries=MAX_CACHED_BOARDS):
+        self.max_entries = max_entries
+        self.boards = OrderedDict()
+
+    def remember(self, user_id, board):
+        self.boards[user_id] = board
+        self.boards.move_to_end(user_id)
+        while len(self.boards) > self.max_entries:
+            self.boards.popitem(last=False)
+
+    # a user's board as a tuple of (player,) rows, or None if they haven't saved one
+    async def get(self, user_id):
+        board = self.boards.get(user_id)
+        if board is None:
+            board = tuple(await db.load_existing(user_id)) or NO_BOARD
+            # a save that finished while we were reading is newer than what we read
+            board = self.boards.get(user_id, board)
+            self.remember(user_id, board)
+        else:
+            self.boards.move_to_end(user_id)
+        return board or None
+
+    async def exists(self, user_id):
+        return await self.get(user_id) is not None
+
+    async def save(self, user_id, username, time_saved, draft_board):
+        board = tuple(draft_board)
+        await db.save_board(user_id, username, time_saved, board)
+        self.remember(user_id, board)
+
+    async def delete(self, user_id):
+        await db.delete_board(user_id)
+        self.remember(user_id, NO_BOARD)
+
+
+# starting draft board every new board is copied from
+# loaded once and replaced as a whole on reload, so a board is always copied from one complete template
+class StartingTemplate:
+    def __init__(self):
+        self.players = ()
+
+    async def load(self):
+        players = tuple(await db.load_starting())
+        self.players = players
+        return players
+
+    # new boards only copy references to the shared (player,) rows
+    def new_board(self):
+        return list(self.players)
+
+
+boards = DraftBoardRepository()
+template = StartingTemplate()
@@ -1,14 +1,29 @@
 import os
+import asyncio
 import discord
-import sqlite3
-import requests
-import re
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 from discord.ui import View, Select, Button, Modal, TextInput
-from bs4 import BeautifulSoup
 from datetime import datetime
 from dotenv import load_dotenv
+from http_client import close_session
+from page_cache import pages, SOURCES, DEFAULT_SOURCE
+from projections import ros_projections
+from player_index import player_index
+from schedule_index import schedule_index, canonical_team
+from database import db
+from board_repository import boards, template
+from ranked_board import RankedBoard
+from bulk_edit import apply_bulk_edit
+from draft_sessions import sessions, first_rank_shown, moving_player_shown, IDLE_TIMEOUT
+from season_stats import season_stats, STAT_NAMES, CURRENT_SEASON, LAST_SEASON, display, combine_stats
+from refresh_scheduler import scheduler
+from weekly_projections import get_projections, get_boom_bust
+from news_feed import news_feed, ITEMS_PER_POST
+from waiver_trends import waiver_trends
+from phases import mark_failed, timed
+from metrics import metrics, measured, METRICS_INTERVAL, BUCKETS
+from loop_watchdog import watchdog
 
 # load environment variables
 load_dotenv()
@@ -19,128 +34,193 @@ intents = discord.Intents.default()
 intents.messages = True
 intents.message_content = True
 intents.reactions = True
-bot = commands.Bot(command_prefix='/', intents=intents)
-
-# create or connect to the SQLite database
-storage = sqlite3.connect('draft_board.db', check_same_thread=False)
-cursor = storage.cursor()
-
-# ensure the necessary tables exist
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        user_id INTEGER PRIMARY KEY,
-        username TEXT NOT NULL,
-        date TEXT
-    )
-''')
-cursor.execute('''
-    CREATE TABLE IF NOT EXISTS draft_board (
-        user_id INTEGER,
-        ranking INTEGER,
-        player TEXT,
-        PRIMARY KEY (user_id, ranking),
-        FOREIGN KEY (user_id) REFERENCES users (user_id)
-    )
-''')
-storage.commit()
-
-# read starting draft board
-async def load_starting():
-    global players
-    starting_storage = sqlite3.connect('starting_draftboard.db')
-    cursor = starting_storage.cursor()
-    query = "SELECT player FROM players"
-    cursor.execute(query)
-    players = cursor.fetchall()
-    starting_storage.close()
-    return players
-
-# load existing draftboard
+
+# bot that also releases the shared http session when shutting down
+class FantasyBot(commands.Bot):
+    async def setup_hook(self):
+        await db.connect()
+        await load_player_index()
+        await load_schedule_index()
+        await template.load()
+        await news_feed.load()
+        # persistent copies of the draft board views so buttons keep working after a view is dropped or the bot restarts
+        self.add_view(DraftBoardViewWithSelect())
+        self.add_view(DraftBoardViewWithoutSelect())
+        refresh_indexes.start()
+        scheduler.prepare('news', post_breaking_news)
+        scheduler.prepare('trends', prepare_trends)
+        scheduler.start()
+        write_metrics.start()
+        watchdog.start()
+
+    async def close(self):
+        watchdog.stop()
+        scheduler.stop()
+        write_metrics.cancel()
+        await close_session()
+        await db.close()
+        await super().close()
+
+bot = FantasyBot(command_prefix='/', intents=intents)
+
+# builds the autocomplete index from every player in player_seasons
+async def load_player_index():
+    global player_index_fingerprint
+    player_index_fingerprint = await db.players_fingerprint()
+    player_index.rebuild(await db.player_rankings())
+
+# builds the (team, week) schedule index from the schedules table
+async def load_schedule_index():
+    global schedule_index_fingerprint
+    schedule_index_fingerprint = await db.schedule_fingerprint()
+    schedule_index.rebuild(await db.fetch_schedule())
+
+# load existing draftboard (None if the user hasn't saved one)
 async def load_existing(discord_id):
-    with sqlite3.connect("draft_board.db") as storage:
-        user_id = str(discord_id)
-        cursor = storage.cursor()
-        query = "SELECT player FROM draft_board WHERE user_id=?"
-        cursor.execute(query, (user_id,))
-        old_players = cursor.fetchall()
-    return old_players
+    return await boards.get(discord_id)
 
 # check if user already has a custom draft board
 async def check_exists(discord_id):
-    old_players = await load_existing(discord_id)
-    hasDraftboard = False
-    if len(old_players) == 150:
-        hasDraftboard = True
-    return hasDraftboard
+    return await boards.exists(discord_id)
+
+# keeps the prometheus text file up to date
+@tasks.loop(seconds=METRICS_INTERVAL)
+async def write_metrics():
+    try:
+        await metrics.write_prometheus()
+    except OSError as e:
+        print(f"Failed to write metrics: {e}")
+
+# rebuilds the autocomplete and schedule indexes after get_lastyear.py or get_schedule.py loads new data
+@tasks.loop(minutes=5)
+async def refresh_indexes():
+    if await db.players_fingerprint() != player_index_fingerprint:
+        await load_player_index()
+    if await db.schedule_fingerprint() != schedule_index_fingerprint:
+        await load_schedule_index()
 
 # on bot startup connect to guild and print confirmation
 @bot.event
 async def on_ready():
-    await load_starting()
     synced = await bot.tree.sync()
     print("Fantasy Football Bot is Online!")
     print(f"Synced {len(synced)} command(s)")
 
+# unsaved edits don't survive a restored session, so its first answer says which board the user is now editing
+RESTORED_NOTICE = ("Your editing session was restored from your last saved draft board (or the starting board if you never saved), "
+                   "so any changes you hadn't saved were lost.")
+
+async def notify_restored(view, interaction: discord.Interaction):
+    if getattr(view, 'restored', False):
+        view.restored = False
+        await interaction.followup.send(RESTORED_NOTICE, ephemeral=True)
+
+# callback that runs a view method, first rebuilding the session when the click reached a persistent view
+def route(view, name):
+    async def callback(interaction: discord.Interaction):
+        target = view
+        if view.invoker_id is None:
+            target = await type(view).restore(interaction)
+            if target is None:
+                return
+        else:
+            sessions.touch(view.invoker_id)
+        await getattr(target, name)(interaction)
+        # a modal can't be followed up, its submit sends the notice instead
+        if interaction.response.type is not discord.InteractionResponseType.modal:
+            await notify_restored(target, interaction)
+    return callback
+
 # class for creating the draft board
+# views made without an invoker are the persistent copies registered at startup, they rebuild the clicking user's session
 class DraftBoardViewWithSelect(View):
-    def __init__(self, draft_board, invoker_id):
-        super().__init__(timeout=None)
-        self.draft_board = draft_board
+    def __init__(self, draft_board=(), invoker_id=None, page=0):
+        super().__init__(timeout=IDLE_TIMEOUT if invoker_id is not None else None)
+        self.draft_board = RankedBoard(draft_board)
         self.selected_player_index = None
         self.currently_moving_player = None
-        self.page = 0
+        self.page = page
         self.items_per_page = 12
         self.invoker_id = invoker_id
+        # rebuilt from the saved board, the user hasn't been told yet
+        self.restored = False
         self.select_menu = Select(
+            custom_id='draftboard:edit:select',
             placeholder='Select a player to move',
             options=[
                 discord.SelectOption(label=player[0], value=str(index))
-                for index, player in enumerate(self.draft_board[:self.items_per_page])
+                for index, player in self.draft_board.page(0, self.items_per_page)
             ]
         )
-        self.select_menu.callback = self.select_callback
+        self.select_menu.callback = route(self, 'select_callback')
         self.add_item(self.select_menu)
 
-        move_up_button = Button(label='Move Up', style=discord.ButtonStyle.primary)
-        move_up_button.callback = self.move_up_callback
+        move_up_button = Button(label='Move Up', style=discord.ButtonStyle.primary, custom_id='draftboard:edit:move_up')
+        move_up_button.callback = route(self, 'move_up_callback')
         self.add_item(move_up_button)
 
-        move_down_button = Button(label='Move Down', style=discord.ButtonStyle.primary)
-        move_down_button.callback = self.move_down_callback
+        move_down_button = Button(label='Move Down', style=discord.ButtonStyle.primary, custom_id='draftboard:edit:move_down')
+        move_down_button.callback = route(self, 'move_down_callback')
         self.add_item(move_down_button)
 
-        move_to_position_button = Button(label='Move to specific position', style=discord.ButtonStyle.secondary)
-        move_to_position_button.callback = self.move_to_position_callback
+        move_to_position_button = Button(label='Move to specific position', style=discord.ButtonStyle.secondary, custom_id='draftboard:edit:move_to')
+        move_to_position_button.callback = route(self, 'move_to_position_callback')
         self.add_item(move_to_position_button)
 
-        swap_button = Button(label='Swap with specific position', style=discord.ButtonStyle.secondary)
-        swap_button.callback = self.swap_button_callback
+        swap_button = Button(label='Swap with specific position', style=discord.ButtonStyle.secondary, custom_id='draftboard:edit:swap')
+        swap_button.callback = route(self, 'swap_button_callback')
         self.add_item(swap_button)
 
-        save_button = Button(label='Save order', style=discord.ButtonStyle.success)
-        save_button.callback = self.save_callback
+        save_button = Button(label='Save order', style=discord.ButtonStyle.success, custom_id='draftboard:edit:save')
+        save_button.callback = route(self, 'save_callback')
         self.add_item(save_button)
 
-        previous_page_button = Button(label='Previous', style=discord.ButtonStyle.secondary)
-        previous_page_button.callback = self.previous_page
+        bulk_edit_button = Button(label='Bulk edit', style=discord.ButtonStyle.secondary, custom_id='draftboard:edit:bulk')
+        bulk_edit_button.callback = route(self, 'bulk_edit_callback')
+        self.add_item(bulk_edit_button)
+
+        previous_page_button = Button(label='Previous', style=discord.ButtonStyle.secondary, custom_id='draftboard:edit:previous')
+        previous_page_button.callback = route(self, 'previous_page')
         self.add_item(previous_page_button)
 
-        next_page_button = Button(label='Next', style=discord.ButtonStyle.secondary)
-        next_page_button.callback = self.next_page
+        next_page_button = Button(label='Next', style=discord.ButtonStyle.secondary, custom_id='draftboard:edit:next')
+        next_page_button.callback = route(self, 'next_page')
         self.add_item(next_page_button)
 
         self.update_options()
+        if invoker_id is not None:
+            sessions.track(invoker_id, self)
 
     # check if user who pressed button is the same user that initiated the command
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.id != self.invoker_id:
+        if self.invoker_id is not None and interaction.user.id != self.invoker_id:
             await interaction.response.send_message("You are not authorized to use these buttons.", ephemeral=True)
             return False
         return True
 
+    async def on_timeout(self):
+        sessions.release(self.invoker_id, self)
+
+    # rebuilds the user's editing session after the original view was dropped or the bot restarted
+    # unsaved changes are gone, so this starts from their saved board (or the starting board if they never saved)
+    @classmethod
+    async def restore(cls, interaction: discord.Interaction):
+        draft_board = await load_existing(interaction.user.id) or template.new_board()
+        content = interaction.message.content if interaction.message else ''
+        view = cls(draft_board, invoker_id=interaction.user.id, page=(first_rank_shown(content) - 1) // 12)
+        view.restored = True
+        moving_player = moving_player_shown(content)
+        for index, player in enumerate(view.draft_board):
+            if player[0] == moving_player:
+                view.selected_player_index = index
+                view.currently_moving_player = player
+                break
+        return view
+
     # selecting player drop down
     async def select_callback(self, interaction: discord.Interaction):
-        self.selected_player_index = self.page * 12 + int(self.select_menu.values[0])
+        # read from the interaction since a rebuilt view's select menu never received the values
+        self.selected_player_index = self.page * self.items_per_page + int(interaction.data['values'][0])
         self.currently_moving_player = self.draft_board[self.selected_player_index]
         await interaction.response.edit_message(
             content=self.create_draft_board_message(), view=self
@@ -151,8 +231,8 @@ class DraftBoardViewWithSelect(View):
         start_index = self.page * self.items_per_page
         end_index = start_index + self.items_per_page
         self.select_menu.options = [
-            discord.SelectOption(label=player[0], value=str(index))
-            for index, player in enumerate(self.draft_board[start_index:end_index])
+            discord.SelectOption(label=player[0], value=str(index - start_index))
+            for index, player in self.draft_board.page(start_index, self.items_per_page)
         ]
 
         self.children[-2].disabled = self.page == 0
@@ -162,11 +242,9 @@ class DraftBoardViewWithSelect(View):
     def create_draft_board_message(self):
         current_player = self.currently_moving_player[0] if self.currently_moving_player else None
         moving_status = f"Currently moving: {current_player}" if current_player else "No player currently selected"
-        start_index = self.page * 12
-        end_index = start_index + 12
-        displayed_players = self.draft_board[start_index:end_index]
+        start_index = self.page * self.items_per_page
         draft_board_status = "\n".join(
-            f"{start_index + i + 1}. {player[0]}" for i, player in enumerate(displayed_players)
+            f"{index + 1}. {player[0]}" for index, player in self.draft_board.page(start_index, self.items_per_page)
         )
 
         total_content = f"{moving_status}\n\nUpdated Draft Board:\n{draft_board_status}"
@@ -176,8 +254,7 @@ class DraftBoardViewWithSelect(View):
     # adds functionality to 'move up' button
     async def move_up_callback(self, interaction: discord.Interaction):
         if self.currently_moving_player is not None and self.selected_player_index is not None and self.selected_player_index > 0:
-            self.draft_board[self.selected_player_index], self.draft_board[self.selected_player_index - 1] = \
-                self.draft_board[self.selected_player_index - 1], self.draft_board[self.selected_player_index]
+            self.draft_board.swap(self.selected_player_index, self.selected_player_index - 1)
             self.selected_player_index -= 1
             self.update_options()
             await interaction.response.edit_message(
@@ -192,8 +269,7 @@ class DraftBoardViewWithSelect(View):
     # adds functionality to 'move down' button
     async def move_down_callback(self, interaction: discord.Interaction):
         if self.currently_moving_player is not None and self.selected_player_index is not None and self.selected_player_index < len(self.draft_board) - 1:
-            self.draft_board[self.selected_player_index], self.draft_board[self.selected_player_index + 1] = \
-                self.draft_board[self.selected_player_index + 1], self.draft_board[self.selected_player_index]
+            self.draft_board.swap(self.selected_player_index, self.selected_player_index + 1)
             self.selected_player_index += 1
             self.update_options()
             await interaction.response.edit_message(
@@ -225,29 +301,25 @@ class DraftBoardViewWithSelect(View):
                 ephemeral=True
             )
 
+    # adds functionality to 'bulk edit' button
+    async def bulk_edit_callback(self, interaction: discord.Interaction):
+        await interaction.response.send_modal(BulkEditModal(self))
+
     # saves user information, time, and draft board in database
     async def save_callback(self, interaction: discord.Interaction):
+        await self.save_board(interaction)
+        if self.restored:
+            self.restored = False
+            await interaction.response.send_message(f"Draft board saved successfully. {RESTORED_NOTICE}", ephemeral=True)
+        else:
+            await interaction.response.send_message("Draft board saved successfully.", ephemeral=True)
+
+    async def save_board(self, interaction: discord.Interaction):
         user_id = interaction.user.id
         username = interaction.user.name
         now = datetime.now()
         time_saved = now.strftime("%m/%d/%Y %H:%M:%S")
-        i = 1
-        with sqlite3.connect('draft_board.db') as storage:
-            cursor = storage.cursor()
-            cursor.execute('''
-                INSERT INTO users (user_id, username, date)
-                VALUES (?, ?, ?)
-                ON CONFLICT(user_id) DO UPDATE SET username = excluded.username, date = excluded.date
-            ''', (user_id, username, time_saved))
-            cursor.execute('DELETE FROM draft_board WHERE user_id=?', (user_id,))
-            for player in self.draft_board:
-                cursor.execute('''
-                    INSERT INTO draft_board (user_id, ranking, player)
-                    VALUES (?, ?, ?)
-                ''', (user_id, i, player[0]))
-                i += 1
-            storage.commit()
-            await interaction.response.send_message("Draft board saved successfully.", ephemeral=True)
+        await boards.save(user_id, username, time_saved, self.draft_board)
 
     # shows previous 12 players when 'previous' button is selected
     async def previous_page(self, interaction: discord.Interaction):
@@ -280,14 +352,14 @@ class SwapWithPositionModal(Modal):
     def __init__(self, view: DraftBoardViewWithSelect):
         super().__init__(title="Swap Player with Position")
         self.view = view
-        self.add_item(TextInput(label="Target Position (1-150)", placeholder="Enter a number between 1 and 150"))
+        board_size = len(view.draft_board)
+        self.add_item(TextInput(label=f"Target Position (1-{board_size})", placeholder=f"Enter a number between 1 and {board_size}"))
 
     async def on_submit(self, interaction: discord.Interaction):
         target_position = int(self.children[0].value) - 1
         if 0 <= target_position < len(self.view.draft_board):
             selected_player_index = self.view.selected_player_index
-            self.view.draft_board[selected_player_index], self.view.draft_board[target_position] = \
-                self.view.draft_board[target_position], self.view.draft_board[selected_player_index]
+            self.view.draft_board.swap(selected_player_index, target_position)
             self.view.selected_player_index = target_position
             self.view.update_options()
             await interaction.response.edit_message(
@@ -295,23 +367,24 @@ class SwapWithPositionModal(Modal):
             )
         else:
             await interaction.response.send_message(
-                "Invalid position. Please enter a number between 1 and 150.",
+                f"Invalid position. Please enter a number between 1 and {len(self.view.draft_board)}.",
                 ephemeral=True
             )
+        await notify_restored(self.view, interaction)
 
 # class for move to position modal where user can enter a desired position to move to
 class MoveToPositionModal(Modal):
     def __init__(self, view: DraftBoardViewWithSelect):
         super().__init__(title="Move Player to Position")
         self.view = view
-        self.add_item(TextInput(label="Target Position (1-150)", placeholder="Enter a number between 1 and 150"))
+        board_size = len(view.draft_board)
+        self.add_item(TextInput(label=f"Target Position (1-{board_size})", placeholder=f"Enter a number between 1 and {board_size}"))
 
     async def on_submit(self, interaction: discord.Interaction):
         target_position = int(self.children[0].value) - 1
         if 0 <= target_position < len(self.view.draft_board):
             selected_player_index = self.view.selected_player_index
-            selected_player = self.view.draft_board.pop(selected_player_index)
-            self.view.draft_board.insert(target_position, selected_player)
+            self.view.draft_board.move(selected_player_index, target_position)
             self.view.selected_player_index = target_position
             self.view.update_options()
             await interaction.response.edit_message(
@@ -319,43 +392,92 @@ class MoveToPositionModal(Modal):
             )
         else:
             await interaction.response.send_message(
-                "Invalid position. Please enter a number between 1 and 150.",
+                f"Invalid position. Please enter a number between 1 and {len(self.view.draft_board)}.",
                 ephemeral=True
             )
+        await notify_restored(self.view, interaction)
+
+# class for bulk edit modal where user can paste a ranked list of players or several 'name -> rank' moves
+# every line is checked before anything changes, then the board is redrawn and saved once
+class BulkEditModal(Modal):
+    def __init__(self, view: DraftBoardViewWithSelect):
+        super().__init__(title="Bulk Edit Draft Board")
+        self.view = view
+        self.add_item(TextInput(
+            label="Players in order, or 'name -> rank' moves",
+            style=discord.TextStyle.paragraph,
+            placeholder="Bijan Robinson\nJa'Marr Chase\n\nor\n\nBijan Robinson -> 1\nPuka Nacua -> 8",
+            max_length=4000
+        ))
+
+    async def on_submit(self, interaction: discord.Interaction):
+        new_order, errors = apply_bulk_edit(self.view.draft_board, self.children[0].value)
+        if errors:
+            shown = "\n".join(f"- {error}" for error in errors[:10])
+            more = f"\n...and {len(errors) - 10} more" if len(errors) > 10 else ""
+            await interaction.response.send_message(f"Nothing was changed:\n{shown}{more}", ephemeral=True)
+            await notify_restored(self.view, interaction)
+            return
+
+        self.view.draft_board.reorder(new_order)
+        if self.view.currently_moving_player is not None:
+            self.view.selected_player_index = new_order.index(self.view.currently_moving_player)
+        self.view.update_options()
+        await interaction.response.edit_message(
+            content=self.view.create_draft_board_message(), view=self.view
+        )
+        await self.view.save_board(interaction)
+        await interaction.followup.send("Draft board updated and saved.", ephemeral=True)
+        await notify_restored(self.view, interaction)
 
 # class for existing custom draft board
 class DraftBoardViewWithoutSelect(View):
-    def __init__(self, draft_board, invoker_id):
-        super().__init__(timeout=None)
+    def __init__(self, draft_board=(), invoker_id=None, page=0):
+        super().__init__(timeout=IDLE_TIMEOUT if invoker_id is not None else None)
         self.draft_board = draft_board
-        self.page = 0
+        self.page = page
         self.items_per_page = 12
         self.invoker_id = invoker_id
 
-        edit_button = Button(label='Edit', style=discord.ButtonStyle.primary)
-        edit_button.callback = self.edit_callback
+        edit_button = Button(label='Edit', style=discord.ButtonStyle.primary, custom_id='draftboard:view:edit')
+        edit_button.callback = route(self, 'edit_callback')
         self.add_item(edit_button)
 
-        delete_button = Button(label='Delete', style=discord.ButtonStyle.danger)
-        delete_button.callback = self.delete_callback
+        delete_button = Button(label='Delete', style=discord.ButtonStyle.danger, custom_id='draftboard:view:delete')
+        delete_button.callback = route(self, 'delete_callback')
         self.add_item(delete_button)
 
-        previous_page_button = Button(label='Previous', style=discord.ButtonStyle.secondary)
-        previous_page_button.callback = self.previous_page
+        previous_page_button = Button(label='Previous', style=discord.ButtonStyle.secondary, custom_id='draftboard:view:previous')
+        previous_page_button.callback = route(self, 'previous_page')
         self.add_item(previous_page_button)
 
-        next_page_button = Button(label='Next', style=discord.ButtonStyle.secondary)
-        next_page_button.callback = self.next_page
+        next_page_button = Button(label='Next', style=discord.ButtonStyle.secondary, custom_id='draftboard:view:next')
+        next_page_button.callback = route(self, 'next_page')
         self.add_item(next_page_button)
 
         self.update_options()
+        if invoker_id is not None:
+            sessions.track(invoker_id, self)
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.id != self.invoker_id:
+        if self.invoker_id is not None and interaction.user.id != self.invoker_id:
             await interaction.response.send_message("You are not authorized to use these buttons.", ephemeral=True)
             return False
         return True
 
+    async def on_timeout(self):
+        sessions.release(self.invoker_id, self)
+
+    # rebuilds the view of a saved board after the original view was dropped or the bot restarted
+    @classmethod
+    async def restore(cls, interaction: discord.Interaction):
+        draft_board = await load_existing(interaction.user.id)
+        if not draft_board:
+            await interaction.response.send_message("You do not have a draft board saved under this account. Try /create_draftboard", ephemeral=True)
+            return None
+        content = interaction.message.content if interaction.message else ''
+        return cls(draft_board, invoker_id=interaction.user.id, page=(first_rank_shown(content) - 1) // 12)
+
     def update_options(self):
         start_index = self.page * self.items_per_page
         end_index = start_index + self.items_per_page
@@ -383,7 +505,10 @@ class DraftBoardViewWithoutSelect(View):
     async def edit_callback(self, interaction: discord.Interaction):
         user_id = interaction.user.id
         existing_players = await load_existing(user_id)
-        view = DraftBoardViewWithSelect(existing_players[:], invoker_id=self.invoker_id)
+        if not existing_players:
+            await interaction.response.send_message("You do not have a draft board saved under this account. Try /create_draftboard", ephemeral=True)
+            return
+        view = DraftBoardViewWithSelect(list(existing_players), invoker_id=self.invoker_id)
         await interaction.response.edit_message(
             content="Editing your Draft Board:\n" + "\n".join(f"{i + 1}. {player[0]}" for i, player in enumerate(existing_players[:12])),
             view=view
@@ -392,14 +517,7 @@ class DraftBoardViewWithoutSelect(View):
     # deletes existing draft board from database
     async def delete_callback(self, interaction: discord.Interaction):
         user_id = interaction.user.id
-        old_storage = sqlite3.connect('draft_board.db')
-        cursor = old_storage.cursor()
-        query1 = "DELETE FROM draft_board WHERE user_id=?"
-        cursor.execute(query1, (user_id,))
-        query2 = "DELETE FROM users WHERE user_id=?"
-        cursor.execute(query2, (user_id,))
-        old_storage.commit()
-        old_storage.close()
+        await boards.delete(user_id)
         await interaction.response.send_message("Draft Board Deleted Successfully!", ephemeral=True)
 
 
@@ -469,15 +587,16 @@ async def get_logo(team):
 
 # 'create_draftboard' command to create draft board if user does not have an existing one
 @bot.tree.command(name='create_draftboard', description="Plan out your custom Draft Board, so you're prepared when draft day comes")
+@measured
 async def create_draftboard(interaction: discord.Interaction):
     user_id = interaction.user.id
     check = await check_exists(user_id)
     if not check:
-        initial_players = await load_starting()
-        view = DraftBoardViewWithSelect(initial_players[:], invoker_id=interaction.user.id)
-        await interaction.response.send_message(
-            content="Current Draft Board:\n" + "\n".join(f"{i + 1}. {player[0]}" for i, player in enumerate(initial_players[:12])), view=view, ephemeral=True
-        )
+        with timed('embed'):
+            initial_players = template.new_board()
+            view = DraftBoardViewWithSelect(initial_players, invoker_id=interaction.user.id)
+            content = "Current Draft Board:\n" + "\n".join(f"{i + 1}. {player[0]}" for i, player in enumerate(initial_players[:12]))
+        await interaction.response.send_message(content=content, view=view, ephemeral=True)
     else:
         await interaction.response.send_message(
             content="You've already created a draft board. Try /manage_draftboard", ephemeral=True
@@ -485,142 +604,80 @@ async def create_draftboard(interaction: discord.Interaction):
 
 # view, edit, or delete draft board if user already has a created one
 @bot.tree.command(name='manage_draftboard', description='View, Edit, or Delete your Personal Fantasy Football Draft Board')
+@measured
 async def manage_draftboard(interaction: discord.Interaction):
     user_id = interaction.user.id
-    check = await check_exists(user_id)
-    if check:
-        existing_players = await load_existing(user_id)
-        view = DraftBoardViewWithoutSelect(existing_players, invoker_id=interaction.user.id)
-
-        await interaction.response.send_message(
-            content=view.create_draft_board_message(), view=view, ephemeral=True
-        )
+    existing_players = await load_existing(user_id)
+    if existing_players:
+        with timed('embed'):
+            view = DraftBoardViewWithoutSelect(existing_players, invoker_id=interaction.user.id)
+            content = view.create_draft_board_message()
+        await interaction.response.send_message(content=content, view=view, ephemeral=True)
     else:
         await interaction.response.send_message(
             content="You do not have a draft board saved under this account. Try /create_draftboard", ephemeral=True
         )
 
-# autocomplete function for players' names
+# autocomplete function for players' names, answered from the in memory index
 async def player_autocomplete(interaction: discord.Interaction, current: str) -> list[discord.app_commands.Choice[str]]:
-    storage = sqlite3.connect('draft_board.db')
-    cursor = storage.cursor()
-    parts = current.split()
-    if len(parts) == 1:
-        query = "SELECT player FROM last_year_stats WHERE player LIKE ? OR player LIKE ? LIMIT 20"
-        cursor.execute(query, (f'{parts[0]}%', f'% {parts[0]}%'))
-    elif len(parts) > 1:
-        query = "SELECT player FROM last_year_stats WHERE player LIKE ? LIMIT 20"
-        cursor.execute(query, (f'{parts[0]}% {parts[1]}%',))
-
-    results = cursor.fetchall()
-    storage.close()
-
-    choices = [discord.app_commands.Choice(name=player[0], value=player[0]) for player in results]
+    choices = [discord.app_commands.Choice(name=player, value=player) for player in player_index.search(current)]
     return choices
 
-# retrieves player's stats from last season from the database and displays them for a player chosen by the user
-@bot.tree.command(name='last_season_stats', description="View a player's fantasy football stats from the 2023-24 season")
+# adds stats to an embed in two columns, first half on the left and second half on the right
+def add_stat_fields(stats_embed, stat_names, stats):
+    half = (len(stat_names) + 1) // 2
+    for i in range(half):
+        if i > 0:
+            stats_embed.add_field(name='', value='', inline=False)
+        stats_embed.add_field(name=stat_names[i], value=stats[i], inline=True)
+        if i + half < len(stat_names):
+            stats_embed.add_field(name=stat_names[i + half], value=stats[i + half], inline=True)
+
+# '2023-24' for the 2023 season
+def season_label(season):
+    return f"{season}-{(season + 1) % 100:02d}"
+
+# retrieves player's stats from last season (or an earlier loaded season) from the database and displays them for a player chosen by the user
+@bot.tree.command(name='last_season_stats', description=f"View a player's fantasy football stats from the {season_label(LAST_SEASON)} season")
 @app_commands.describe(player="Enter the player whose stats you'd like to view")
-async def last_season_stats(interaction: discord.Interaction, player: str):
+@app_commands.describe(season=f"Enter an earlier season to view (defaults to {LAST_SEASON})")
+@measured
+async def last_season_stats(interaction: discord.Interaction, player: str, season: app_commands.Range[int, 2000, LAST_SEASON] = LAST_SEASON):
     await interaction.response.defer(thinking=True, ephemeral=True)
 
     try:
-        # get all stats of player from database
-        with sqlite3.connect("draft_board.db") as storage:
-            cursor = storage.cursor()
-            query = 'SELECT points_per_game, ranking, games_played, stat1, stat2, stat3, stat4, stat5, stat6 FROM last_year_stats WHERE player=?'
-            cursor.execute(query, (player,))
-            player_info = cursor.fetchall()
-
-        if not player_info:
-            await interaction.followup.send(f'There are no recorded stats for {player}. Check your spelling.', ephemeral=True)
-        else:
-            ppg, rank, games_played, stat1, stat2, stat3, stat4, stat5, stat6 = player_info[0]
-
-            if 'QB' in rank:
-                stat1_name = 'Passing Yards'
-                stat2_name = 'Passing TDs'
-                stat3_name = 'Interceptions'
-                stat4_name = 'Rushing Attempts'
-                stat5_name = 'Rushing Yards'
-                stat6_name = 'Rushing TDs'
-            elif 'RB' in rank:
-                stat1_name = 'Rushing Attempts'
-                stat2_name = 'Rushing Yards'
-                stat3_name = 'Total TDs'
-                stat4_name = 'Targets'
-                stat5_name = 'Receptions'
-                stat6_name = 'Receiving Yards'
-            elif 'WR' in rank:
-                stat1_name = 'Targets'
-                stat2_name = 'Receptions'
-                stat3_name = 'Receiving Yards'
-                stat4_name = 'Total TDs'
-                stat5_name = 'Rushing Attempts'
-                stat6_name = 'Rushing Yards'
-            elif 'TE' in rank:
-                stat1_name = 'Targets'
-                stat2_name = 'Catches'
-                stat3_name = 'Receiving Yards'
-                stat4_name = 'Receiving TDs'
-                stat5_name = 'null'
-                stat6_name = 'null'
-
-            position = rank[:2]
-
-            # get team from website
-            url = requests.get(f"https://www.cbssports.com/fantasy/football/stats/{position}/2023/season/stats/ppr/")
-            doc = BeautifulSoup(url.text, "html.parser")
-            player_names = doc.findAll("span", attrs="CellPlayerName--long")
-
-            playerStr = ''
-            for name in player_names:
-                if player in name.text:
-                    playerStr = name.text
-                    break
-
-            if not playerStr:
-                await interaction.followup.send(f'There are no recorded stats for {player}. Check your spelling.', ephemeral=True)
-                return
+        # get all stats of player for the season from database
+        player_info = await db.fetch_season_stats(player, season)
 
-            playerStr = playerStr.strip()
-            team = playerStr[-3:].strip()
+        # rookies are stored without stats
+        if not player_info or player_info['rank'] is None or player_info['position'] not in STAT_NAMES:
+            await interaction.followup.send(f'There are no recorded {season} stats for {player}. Check your spelling.', ephemeral=True)
+        else:
+            position = player_info['position']
+            stats = combine_stats(position, player_info)
 
             # get logo
-            logo = await get_logo(team)
+            logo = await get_logo(player_info['team'])
             if not logo:
                 logo = "https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png"
 
             # display stats in embed
-            stats_embed = discord.Embed(title=f"{player}'s 2023-24 Stats", color=0x00ffd5)
-            stats_embed.set_author(name="Fantasy Football Bot", icon_url=logo)
-            stats_embed.add_field(name='Rank', value=rank, inline=True)
-            stats_embed.add_field(name='Fantasy PPG', value=ppg, inline=True)
-            stats_embed.add_field(name='Games Played', value=games_played, inline=True)
-            stats_embed.add_field(name='', value='', inline=False)
-            if 'null' not in stat5_name:
-                stats_embed.add_field(name=stat1_name, value=stat1, inline=True)
-                stats_embed.add_field(name=stat4_name, value=stat4, inline=True)
+            with timed('embed'):
+                stats_embed = discord.Embed(title=f"{player}'s {season_label(season)} Stats", color=0x00ffd5)
+                stats_embed.set_author(name="Fantasy Football Bot", icon_url=logo)
+                stats_embed.add_field(name='Rank', value=f"{position}{player_info['rank']}", inline=True)
+                stats_embed.add_field(name='Fantasy PPG', value=display(player_info['points_per_game']), inline=True)
+                stats_embed.add_field(name='Games Played', value=display(player_info['games_played']), inline=True)
                 stats_embed.add_field(name='', value='', inline=False)
-                stats_embed.add_field(name=stat2_name, value=stat2, inline=True)
-                stats_embed.add_field(name=stat5_name, value=stat5, inline=True)
+                add_stat_fields(stats_embed, STAT_NAMES[position], [display(stat) for stat in stats])
                 stats_embed.add_field(name='', value='', inline=False)
-                stats_embed.add_field(name=stat3_name, value=stat3, inline=True)
-                stats_embed.add_field(name=stat6_name, value=stat6, inline=True)
-            else:
-                stats_embed.add_field(name=stat1_name, value=stat1, inline=True)
-                stats_embed.add_field(name=stat3_name, value=stat3, inline=True)
-                stats_embed.add_field(name='', value='', inline=False)
-                stats_embed.add_field(name=stat2_name, value=stat2, inline=True)
-                stats_embed.add_field(name=stat4_name, value=stat4, inline=True)
-
-            stats_embed.add_field(name='', value='', inline=False)
-            stats_embed.timestamp = datetime.now()
-            stats_embed.set_footer(text='Last Season Stats')
+                stats_embed.timestamp = datetime.now()
+                stats_embed.set_footer(text='Last Season Stats')
 
             await interaction.followup.send(embed=stats_embed, ephemeral=True)
 
     except Exception as e:
+        mark_failed(e)
         await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
 # adds autocompletion for last_season_stats
@@ -631,182 +688,51 @@ async def last_season_stats_player_autocomplete(interaction: discord.Interaction
 # retrieves player's stats from the current season and displays them for a player chosen by the user
 @bot.tree.command(name='current_stats', description="View a player's fantasy football stats from the 2024-25 season")
 @app_commands.describe(player="Enter the player whose stats you'd like to view")
+@measured
 async def current_stats(interaction: discord.Interaction, player: str):
     await interaction.response.defer(thinking=True, ephemeral=True)
 
     try:
         # get position of player
-        with sqlite3.connect("draft_board.db") as storage:
-            cursor = storage.cursor()
-            query = 'SELECT ranking FROM last_year_stats WHERE player=?'
-            cursor.execute(query, (player,))
-            player_info = cursor.fetchall()
+        positions = await db.fetch_positions([player])
 
-        if not player_info:
+        if player not in positions:
             await interaction.followup.send(content=f"We couldn't find {player} in our database")
             return
         else:
-            position = player_info[0][0][:2]
-        if 'QB' in position:
-            stat1_name = 'Passing Yards'
-            stat2_name = 'Passing TDs'
-            stat3_name = 'Interceptions'
-            stat4_name = 'Rushing Attempts'
-            stat5_name = 'Rushing Yards'
-            stat6_name = 'Rushing TDs'
-        elif 'RB' in position:
-            stat1_name = 'Rushing Attempts'
-            stat2_name = 'Rushing Yards'
-            stat3_name = 'Total TDs'
-            stat4_name = 'Targets'
-            stat5_name = 'Receptions'
-            stat6_name = 'Receiving Yards'
-        elif 'WR' in position:
-            stat1_name = 'Targets'
-            stat2_name = 'Receptions'
-            stat3_name = 'Receiving Yards'
-            stat4_name = 'Total TDs'
-            stat5_name = 'Rushing Attempts'
-            stat6_name = 'Rushing Yards'
-        elif 'TE' in position:
-            stat1_name = 'Targets'
-            stat2_name = 'Catches'
-            stat3_name = 'Receiving Yards'
-            stat4_name = 'Receiving TDs'
-            stat5_name = 'null'
-            stat6_name = 'null'
-        else:
+            position = positions[player]
+        if position not in STAT_NAMES:
             await interaction.followup.send(content=f"We couldn't find any stats for {player}")
             return
 
-        # get stats from online
-        url = requests.get(f"https://www.cbssports.com/fantasy/football/stats/{position}/2024/season/stats/ppr/")
-        doc = BeautifulSoup(url.text, "html.parser")
-        player_names = doc.findAll("span", attrs="CellPlayerName--long")
-        stats = doc.findAll("td", attrs="TableBase-bodyTd")
-
-        # find player in html
-        playerStr = ''
-        i = 0
-        for name in player_names:
-            if player in name.text:
-                playerStr = name.text
-                break
-            i += 1
-
-        if not playerStr:
+        # find player in the parsed season table
+        row = await season_stats.lookup(player, position, CURRENT_SEASON)
+        if row is None:
             await interaction.followup.send(f"We couldn't find any stats for {player}", ephemeral=True)
             return
 
-        playerStr = playerStr.strip()
-        team = playerStr[-3:].strip()
-        rank = position + str(i + 1)
-
-        # define offsets based on position
-        if 'QB' in position:
-            pos_multi = 16
-            offset1 = 1
-            offset2 = 4
-            offset3 = 6
-            offset4 = 7
-            offset5 = 9
-            offset6 = 10
-            offset7 = 12
-            offset8 = 15
-        elif 'RB' in position:
-            pos_multi = 15
-            offset1 = 1
-            offset2 = 2
-            offset3 = 3
-            offset4 = 5
-            offset5 = 6
-            offset6 = 7
-            offset7 = 8
-            offset8 = 11
-            offset9 = 14
-        elif 'WR' in position:
-            pos_multi = 15
-            offset1 = 1
-            offset2 = 2
-            offset3 = 3
-            offset4 = 4
-            offset5 = 7
-            offset6 = 8
-            offset7 = 9
-            offset8 = 11
-            offset9 = 14
-        elif 'TE' in position:
-            pos_multi = 11
-            offset1 = 1
-            offset2 = 2
-            offset3 = 3
-            offset4 = 4
-            offset5 = 7
-            offset6 = 10
-
-        # retrieve stats based on offsets
-        games_played = stats[i * pos_multi + offset1].text.strip()
-        stat1 = stats[i * pos_multi + offset2].text.strip()
-        stat2 = stats[i * pos_multi + offset3].text.strip()
-        stat3 = stats[i * pos_multi + offset4].text.strip()
-        stat4 = stats[i * pos_multi + offset5].text.strip()
-
-        if 'TE' in position:
-            ppg = stats[i * pos_multi + offset6].text.strip()
-        else:
-            stat5 = stats[i * pos_multi + offset6].text.strip()
-            stat6 = stats[i * pos_multi + offset7].text.strip()
-            if 'QB' in position:
-                ppg = stats[i * pos_multi + offset8].text.strip()
-            elif 'RB' in position or 'WR' in position:
-                stat_add = stats[i * pos_multi + offset8].text.strip()
-                ppg = stats[i * pos_multi + offset9].text.strip()
-
-        # adjust stat values for certain positions
-        if 'RB' in position:
-            if '—' not in stat3 or '—' not in stat_add:
-                stat3 = str(int(stat3) + int(stat_add))
-
-        if 'WR' in position:
-            if '—' not in stat4 or '—' not in stat_add:
-                stat4 = str(int(stat4) + int(stat_add))
-
         # get the logo for the player's team
-        logo = await get_logo(team)
+        logo = await get_logo(row.team)
         if not logo:
             logo = "https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png"
 
         # create the embed to display the info
-        stats_embed = discord.Embed(title=f"{player}'s 2024-25 Stats", color=discord.Color.brand_green())
-        stats_embed.set_author(name="Fantasy Football Bot", icon_url=logo)
-        stats_embed.add_field(name='Rank', value=rank, inline=True)
-        stats_embed.add_field(name='Fantasy PPG', value=ppg, inline=True)
-        stats_embed.add_field(name='Games Played', value=games_played, inline=True)
-        stats_embed.add_field(name='', value='', inline=False)
-
-        if 'null' not in stat5_name:
-            stats_embed.add_field(name=stat1_name, value=stat1, inline=True)
-            stats_embed.add_field(name=stat4_name, value=stat4, inline=True)
-            stats_embed.add_field(name='', value='', inline=False)
-            stats_embed.add_field(name=stat2_name, value=stat2, inline=True)
-            stats_embed.add_field(name=stat5_name, value=stat5, inline=True)
+        with timed('embed'):
+            stats_embed = discord.Embed(title=f"{player}'s 2024-25 Stats", color=discord.Color.brand_green())
+            stats_embed.set_author(name="Fantasy Football Bot", icon_url=logo)
+            stats_embed.add_field(name='Rank', value=row.rank, inline=True)
+            stats_embed.add_field(name='Fantasy PPG', value=display(row.ppg), inline=True)
+            stats_embed.add_field(name='Games Played', value=display(row.games_played), inline=True)
             stats_embed.add_field(name='', value='', inline=False)
-            stats_embed.add_field(name=stat3_name, value=stat3, inline=True)
-            stats_embed.add_field(name=stat6_name, value=stat6, inline=True)
-        else:
-            stats_embed.add_field(name=stat1_name, value=stat1, inline=True)
-            stats_embed.add_field(name=stat3_name, value=stat3, inline=True)
+            add_stat_fields(stats_embed, STAT_NAMES[position], [display(stat) for stat in row.stats])
             stats_embed.add_field(name='', value='', inline=False)
-            stats_embed.add_field(name=stat2_name, value=stat2, inline=True)
-            stats_embed.add_field(name=stat4_name, value=stat4, inline=True)
-
-        stats_embed.add_field(name='', value='', inline=False)
-        stats_embed.timestamp = datetime.now()
-        stats_embed.set_footer(text='Current Stats')
+            stats_embed.timestamp = datetime.now()
+            stats_embed.set_footer(text='Current Stats')
 
         await interaction.followup.send(embed=stats_embed, ephemeral=True)
 
     except Exception as e:
+        mark_failed(e)
         await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
 # adds autocomplete functionality for /current_stats
@@ -814,27 +740,34 @@ async def current_stats(interaction: discord.Interaction, player: str):
 async def current_stats_player_autocomplete(interaction: discord.Interaction, current: str) -> list[discord.app_commands.Choice[str]]:
     return await player_autocomplete(interaction, current)
 
+# rebuilds the waiver trends snapshot after each scheduled refresh
+async def prepare_trends(urls):
+    await waiver_trends.latest()
+
+# why a player has no game in a week
+def no_game_message(player, team, week):
+    if schedule_index.is_bye(team, week):
+        return f"{player} is on a bye in Week {week}!"
+    return f"{player} Doesn't have a scheduled match this week!"
+
 # user can compare two players projected fantasy football stats for a given week
 @bot.tree.command(name='start_or_sit', description="Compare two players' projected fantasy performance for a given week")
 @app_commands.describe(player1="Enter the first player you'd like to compare")
 @app_commands.describe(player2="Enter the second player you'd like to compare")
 @app_commands.describe(week="Enter the week you'd like to compare stats in")
+@measured
 async def start_or_sit(interaction: discord.Interaction, player1: str, player2: str, week: str):
     await interaction.response.defer(thinking=True, ephemeral=True)
 
     try:
         # get ranking (just need position) from database of players
-        with sqlite3.connect('draft_board.db') as storage:
-            cursor = storage.cursor()
-            query = "SELECT ranking FROM last_year_stats WHERE player=?"
-            cursor.execute(query, (player1,))
-            pos1 = cursor.fetchall()
-            cursor.execute(query, (player2,))
-            pos2 = cursor.fetchall()
-
-        # format position ranking to be position ex: QB1 -> qb
+        positions = await db.fetch_positions([player1, player2])
+        pos1 = positions.get(player1)
+        pos2 = positions.get(player2)
+
+        # format position to be lowercase ex: QB -> qb
         if pos1:
-            position1 = pos1[0][0][:2].lower()
+            position1 = pos1.lower()
         elif not pos2:
             await interaction.followup.send(content=f"We couldn't find {player1} or {player2} in our database. Try selecting a player from the drop down menu.", ephemeral=True)
             return
@@ -842,7 +775,7 @@ async def start_or_sit(interaction: discord.Interaction, player1: str, player2:
             await interaction.followup.send(content=f"We couldn't find {player1} in our database. Try selecting a player from the drop down menu.", ephemeral=True)
             return
         if pos2:
-            position2 = pos2[0][0][:2].lower()
+            position2 = pos2.lower()
         else:
             await interaction.followup.send(content=f"We couldn't find {player2} in our database. Try selecting a player from the drop down menu.", ephemeral=True)
             return
@@ -851,109 +784,21 @@ async def start_or_sit(interaction: discord.Interaction, player1: str, player2:
             await interaction.followup.send(content=f"Please enter a week from 1-17. You entered: {week}", ephemeral=True)
             return
         else:
-            # get consensus player projections for user chosen players and week
-            url1 = requests.get(f"https://www.fantasypros.com/nfl/projections/{position1}.php?week={week}&scoring=PPR")
-            url2 = requests.get(f"https://www.fantasypros.com/nfl/projections/{position2}.php?week={week}&scoring=PPR")
+            # every page the comparison needs, downloaded and parsed at the same time, each distinct page once per download
+            projections1, projections2, boom_bust1, boom_bust2, *season_tables = await asyncio.gather(
+                get_projections(position1, week),
+                get_projections(position2, week),
+                get_boom_bust(position1),
+                get_boom_bust(position2),
+                season_stats.get_table(position1.upper(), CURRENT_SEASON),
+                season_stats.get_table(position2.upper(), CURRENT_SEASON)
+            )
 
-            if position1 == 'qb':
-                url3 = requests.get(f"https://www.fantasypros.com/nfl/reports/boom-bust-qb.php")
-            else:
-                url3 = requests.get(f"https://www.fantasypros.com/nfl/reports/ppr-boom-bust-{position1}.php")
-            if position2 == 'qb':
-                url4 = requests.get(f"https://www.fantasypros.com/nfl/reports/boom-bust-qb.php")
-            else:
-                url4 = requests.get(f"https://www.fantasypros.com/nfl/reports/ppr-boom-bust-{position2}.php")
-
-            doc1 = BeautifulSoup(url1.text, "html.parser")
-            doc2 = BeautifulSoup(url2.text, "html.parser")
-            doc3 = BeautifulSoup(url3.text, "html.parser")
-            doc4 = BeautifulSoup(url4.text, "html.parser")
-
-            player1_info = doc1.findAll("td")
-            player2_info = doc2.findAll("td")
-            player1_bust = doc3.findAll("td")
-            player2_bust = doc4.findAll("td")
-
-            # get boom and bust percentages
-            check1 = False
-            check2 = False
-            boom1 = ''
-            bust1 = ''
-            i = 0
-            for player in player1_bust:
-                if check2 and '%' not in player.text:
-                    bust1 = player1_bust[i - 2].text
-                    break
-                if check1 and '%' in player.text and not check2:
-                    check2 = True
-                    boom1 = player.text
-                if player1 in player.text:
-                    check1 = True
-                i += 1
-
-            check1 = False
-            check2 = False
-            boom2 = ''
-            bust2 = ''
-            i = 0
-            for player in player2_bust:
-                if check2 and '%' not in player.text:
-                    bust2 = player2_bust[i - 2].text
-                    break
-                if check1 and '%' in player.text and not check2:
-                    check2 = True
-                    boom2 = player.text
-                if player2 in player.text:
-                    check1 = True
-                i += 1
-
-            # define offsets for each position (each position has that many stats on the website until next player)
-            pos1_offset = 0
-            if position1 == "qb":
-                pos1_offset = 10
-            elif position1 == "wr":
-                pos1_offset = 8
-            elif position1 == "rb":
-                pos1_offset = 8
-            elif position1 == "te":
-                pos1_offset = 5
-
-            found1 = False
-            team1 = ''
-            projection1 = ''
-
-            # get team and projections for player using position offsets
-            for i in range(len(player1_info)):
-                if found1:
-                    break
-                if player1 in player1_info[i].text:
-                    team1 = player1_info[i].text
-                    team1 = team1[-3:].strip()
-                    found1 = True
-                    projection1 = player1_info[i + pos1_offset].text
-
-            pos2_offset = 0
-            if position2 == "qb":
-                pos2_offset = 10
-            elif position2 == "wr":
-                pos2_offset = 8
-            elif position2 == "rb":
-                pos2_offset = 8
-            elif position2 == "te":
-                pos2_offset = 5
-
-            found2 = False
-            team2 = ''
-            projection2 = ''
-
-            for i in range(len(player2_info)):
-                if found2:
-                    break
-                if player2 in player2_info[i].text:
-                    team2 = player2_info[i].text
-                    team2 = team2[-3:].strip()
-                    found2 = True
-                    projection2 = player2_info[i + pos2_offset].text
+            # get team and projections, then boom and bust percentages, for each player
+            team1, projection1 = projections1.get(player1, ('', ''))
+            team2, projection2 = projections2.get(player2, ('', ''))
+            boom1, bust1 = boom_bust1.get(player1, ('', ''))
+            boom2, bust2 = boom_bust2.get(player2, ('', ''))
 
             if not projection1:
                 if not projection1:
@@ -965,71 +810,35 @@ async def start_or_sit(interaction: discord.Interaction, player1: str, player2:
                 await interaction.followup.send(content=f"We couldn't find any projections for {player2}", ephemeral=True)
                 return
 
-            # get game information (time, date, home team, away team, week) from database for relevant games
-            with sqlite3.connect("draft_board.db") as schedule_storage:
-                if 'JAC' in team1:
-                    team1 = "JAX"
-                if 'JAC' in team2:
-                    team2 = "JAX"
-                formatted_week = f"Week {week}"
-                cursor1 = schedule_storage.cursor()
-                query1 = "SELECT * FROM schedules WHERE (home_team = ? OR away_team = ?) AND week=?"
-                cursor1.execute(query1,(team1, team1, formatted_week))
-                info1 = cursor1.fetchall()
-                cursor1.execute(query1,(team2, team2, formatted_week))
-                info2 = cursor1.fetchall()
+            # get game information (home team, away team, time, date, week) for each player's team from the schedule index
+            team1 = canonical_team(team1)
+            team2 = canonical_team(team2)
+            formatted_week = f"Week {week}"
+            info1 = schedule_index.game(team1, week)
+            info2 = schedule_index.game(team2, week)
 
             if not info1:
                 if not info2:
                     await interaction.followup.send(content=f"{player1} and {player2} Don't have a scheduled matches this week!", ephemeral=True)
                     return
-                await interaction.followup.send(content=f"{player1} Doesn't have a scheduled match this week!", ephemeral=True)
+                await interaction.followup.send(content=no_game_message(player1, team1, week), ephemeral=True)
                 return
             elif not info2:
-                await interaction.followup.send(content=f"{player2} Doesn't have a scheduled match this week!", ephemeral=True)
+                await interaction.followup.send(content=no_game_message(player2, team2, week), ephemeral=True)
                 return
 
             position1 = position1.upper()
             position2 = position2.upper()
 
-            url5 = requests.get(f"https://www.cbssports.com/fantasy/football/stats/{position1}/2024/season/stats/ppr/")
-            doc5 = BeautifulSoup(url5.text, "html.parser")
-            player_names1 = doc5.findAll("span", attrs="CellPlayerName--long")
-
-            url6 = requests.get(f"https://www.cbssports.com/fantasy/football/stats/{position2}/2024/season/stats/ppr/")
-            doc6 = BeautifulSoup(url6.text, "html.parser")
-            player_names2 = doc6.findAll("span", attrs="CellPlayerName--long")
-
-            # loop through htmls and find index of players (get their ranking at their position)
-            x = 0
-            found1 = False
-            for name in player_names1:
-                if player1 in name.text:
-                    found1 = True
-                    break
-                x += 1
-
-            y = 0
-            found2 = False
-            for name in player_names2:
-                if player2 in name.text:
-                    found2 = True
-                    break
-                y += 1
-
-            # get position ranks using indices x and y from previous for loop
-            if found1:
-                rank1 = position1 + str(x+1)
-            else:
-                rank1 = position1 + '--'
-            if found2:
-                rank2 = position2 + str(y+1)
-            else:
-                rank2 = position2 + '--'
+            # get position ranks from the parsed season tables
+            season_row1 = season_tables[0].get(player1)
+            season_row2 = season_tables[1].get(player2)
+            rank1 = season_row1.rank if season_row1 else position1 + '--'
+            rank2 = season_row2.rank if season_row2 else position2 + '--'
 
             # unpack tuple with game info
-            home1, away1, time1, date1, week1, trash1 = info1[0]
-            home2, away2, time2, date2, week2, trash2 = info2[0]
+            home1, away1, time1, date1, week1 = info1
+            home2, away2, time2, date2, week2 = info2
             if not boom1:
                 boom1 = '—'
             if not bust1:
@@ -1040,32 +849,34 @@ async def start_or_sit(interaction: discord.Interaction, player1: str, player2:
                 bust2 = '—'
 
             # display information to user in an embed
-            compare_embed = discord.Embed(title=f"{formatted_week} Player Comparison", color=discord.Color.orange())
-            compare_embed.set_author(name="Fantasy Football Bot", icon_url="https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png")
-            compare_embed.add_field(name=f"**{player1}**", value="", inline=True)
-            compare_embed.add_field(name=f"{position1.upper()} • {team1}", value='', inline=True)
-            compare_embed.add_field(name="Game Info", value=f"{away1} @ {home1} \n{date1} at {time1}", inline=False)
-            compare_embed.add_field(name="Projected Points", value=projection1, inline=True)
-            compare_embed.add_field(name="Current Rank", value=rank1, inline=True)
-            compare_embed.add_field(name='', value='', inline=False)
-            compare_embed.add_field(name="Boom Chance", value=boom1, inline=True)
-            compare_embed.add_field(name="Bust Chance", value=bust1, inline=True)
-            compare_embed.add_field(name="", value="----------------------------------", inline=False)
-            compare_embed.add_field(name=f"**{player2}**", value='', inline=True)
-            compare_embed.add_field(name=f"{position2.upper()} • {team2}", value='', inline=True)
-            compare_embed.add_field(name="Game Info", value=f"{away2} @ {home2} \n{date2} at {time2}", inline=False)
-            compare_embed.add_field(name="Projected Points", value=projection2, inline=True)
-            compare_embed.add_field(name="Current Rank", value=rank2, inline=True)
-            compare_embed.add_field(name="", value="", inline=False)
-            compare_embed.add_field(name="Boom Chance", value=boom2, inline=True)
-            compare_embed.add_field(name="Bust Chance", value=bust2, inline=True)
-            compare_embed.add_field(name='', value='', inline=False)
-            compare_embed.timestamp = datetime.now()
-            compare_embed.set_footer(text='Start or Sit')
+            with timed('embed'):
+                compare_embed = discord.Embed(title=f"{formatted_week} Player Comparison", color=discord.Color.orange())
+                compare_embed.set_author(name="Fantasy Football Bot", icon_url="https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png")
+                compare_embed.add_field(name=f"**{player1}**", value="", inline=True)
+                compare_embed.add_field(name=f"{position1.upper()} • {team1}", value='', inline=True)
+                compare_embed.add_field(name="Game Info", value=f"{away1} @ {home1} \n{date1} at {time1}", inline=False)
+                compare_embed.add_field(name="Projected Points", value=projection1, inline=True)
+                compare_embed.add_field(name="Current Rank", value=rank1, inline=True)
+                compare_embed.add_field(name='', value='', inline=False)
+                compare_embed.add_field(name="Boom Chance", value=boom1, inline=True)
+                compare_embed.add_field(name="Bust Chance", value=bust1, inline=True)
+                compare_embed.add_field(name="", value="----------------------------------", inline=False)
+                compare_embed.add_field(name=f"**{player2}**", value='', inline=True)
+                compare_embed.add_field(name=f"{position2.upper()} • {team2}", value='', inline=True)
+                compare_embed.add_field(name="Game Info", value=f"{away2} @ {home2} \n{date2} at {time2}", inline=False)
+                compare_embed.add_field(name="Projected Points", value=projection2, inline=True)
+                compare_embed.add_field(name="Current Rank", value=rank2, inline=True)
+                compare_embed.add_field(name="", value="", inline=False)
+                compare_embed.add_field(name="Boom Chance", value=boom2, inline=True)
+                compare_embed.add_field(name="Bust Chance", value=bust2, inline=True)
+                compare_embed.add_field(name='', value='', inline=False)
+                compare_embed.timestamp = datetime.now()
+                compare_embed.set_footer(text='Start or Sit')
 
             await interaction.followup.send(content=None, embed=compare_embed, ephemeral=True)
 
     except Exception as e:
+        mark_failed(e)
         await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
 # adds autocompletion for the start_or_sit command
@@ -1099,6 +910,7 @@ async def start_or_sit_week_autocomplete(interaction: discord.Interaction, curre
 @app_commands.describe(receiving3='Enter a player you are trading for')
 @app_commands.describe(receiving4='Enter a player you are trading for')
 @app_commands.describe(receiving5='Enter a player you are trading for')
+@measured
 async def trade_analyzer(interaction: discord.Interaction, giving1: str = None, giving2: str = None, giving3: str = None, giving4: str = None, giving5: str = None, receiving1: str = None, receiving2: str = None, receiving3: str = None, receiving4: str = None, receiving5: str = None):
     await interaction.response.defer(thinking=True, ephemeral=True)
 
@@ -1145,35 +957,12 @@ async def trade_analyzer(interaction: discord.Interaction, giving1: str = None,
             await interaction.followup.send(content=f"Please enter at least one player that you are trading away (giving) as well as trading for (recieving)", ephemeral=True)
             return
 
-        # get ranking (just need position) from database of players
-        giving_pos = []
-        receiving_pos = []
-
-        for i in range(0, len(giving_player)):
-            with sqlite3.connect('draft_board.db') as storage:
-                cursor = storage.cursor()
-                query = "SELECT ranking FROM last_year_stats WHERE player=?"
-                cursor.execute(query, (giving_player[i],))
-                temp = cursor.fetchall()
-                if temp:
-                    temp = temp[0][0][:2]
-                    giving_pos.append(temp)
-                else:
-                    await interaction.followup.send(content=f"We couldn't find {giving_player[i]} in our database. Try selecting a player from the drop down menu.", ephemeral=True)
-                    return
-
-        for i in range(0, len(receiving_player)):
-            with sqlite3.connect('draft_board.db') as storage:
-                cursor = storage.cursor()
-                query = "SELECT ranking FROM last_year_stats WHERE player=?"
-                cursor.execute(query, (receiving_player[i],))
-                temp = cursor.fetchall()
-                if temp:
-                    temp = temp[0][0][:2]
-                    receiving_pos.append(temp)
-                else:
-                    await interaction.followup.send(content=f"We couldn't find {receiving_player[i]} in our database. Try selecting a player from the drop down menu.", ephemeral=True)
-                    return
+        # make sure every player is in the database with one lookup
+        positions = await db.fetch_positions(giving_player + receiving_player)
+        for player in giving_player + receiving_player:
+            if player not in positions:
+                await interaction.followup.send(content=f"We couldn't find {player} in our database. Try selecting a player from the drop down menu.", ephemeral=True)
+                return
 
         giving_score = []
         giving_team = []
@@ -1182,18 +971,25 @@ async def trade_analyzer(interaction: discord.Interaction, giving1: str = None,
         receiving_team = []
         receiving_rank = []
 
-        # get calculated trade value
-        for i in range(0, len(giving_player)):
-            giving_score.append(await calculate_trade_value(giving_player[i], giving_pos[i], giving_team, giving_rank))
-            if giving_score[i] == -1:
-                await interaction.followup.send(content=f"Unfortunately we couldn't find {giving_player[i]} in our database.", ephemeral=True)
+        # get precomputed trade values from the rest of season projections
+        projections = await ros_projections.get_table()
+        for player in giving_player:
+            projection = projections.lookup(player)
+            if projection is None:
+                await interaction.followup.send(content=f"Unfortunately we couldn't find {player} in our database.", ephemeral=True)
                 return
-
-        for i in range(0, len(receiving_player)):
-            receiving_score.append(await calculate_trade_value(receiving_player[i], receiving_pos[i], receiving_team, receiving_rank))
-            if receiving_score[i] == -1:
-                await interaction.followup.send(content=f"Unfortunately we couldn't find {receiving_player[i]} in our database.", ephemeral=True)
+            giving_team.append(projection.team)
+            giving_rank.append(projection.rank)
+            giving_score.append(projection.value)
+
+        for player in receiving_player:
+            projection = projections.lookup(player)
+            if projection is None:
+                await interaction.followup.send(content=f"Unfortunately we couldn't find {player} in our database.", ephemeral=True)
                 return
+            receiving_team.append(projection.team)
+            receiving_rank.append(projection.rank)
+            receiving_score.append(projection.value)
 
         giving_score_string = ''
         receiving_score_string = ''
@@ -1245,113 +1041,26 @@ async def trade_analyzer(interaction: discord.Interaction, giving1: str = None,
         linebreak = '------------------------------------------------------------'
 
         # display information to user in an embed
-        trade_embed = discord.Embed(title=outcome, color=discord.Color.brand_red())
-        trade_embed.set_author(name="Fantasy Football Bot", icon_url="https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png")
-        trade_embed.add_field(name='', value='', inline=False)
-        trade_embed.add_field(name=f"Trading Away", value=giving_player_string, inline=True)
-        trade_embed.add_field(name="ROS Ranking", value=giving_rank_string, inline=True)
-        trade_embed.add_field(name=f"Trade Value", value=giving_score_string, inline=True)
-        trade_embed.add_field(name='', value=linebreak, inline=False)
-        trade_embed.add_field(name=f"Trading For", value=receiving_player_string, inline=True)
-        trade_embed.add_field(name="ROS Ranking", value=receiving_rank_string, inline=True)
-        trade_embed.add_field(name=f"Trade Value", value=receiving_score_string, inline=True)
-        trade_embed.add_field(name="", value="", inline=False)
-        trade_embed.timestamp = datetime.now()
-        trade_embed.set_footer(text='Trade Analyzer')
+        with timed('embed'):
+            trade_embed = discord.Embed(title=outcome, color=discord.Color.brand_red())
+            trade_embed.set_author(name="Fantasy Football Bot", icon_url="https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png")
+            trade_embed.add_field(name='', value='', inline=False)
+            trade_embed.add_field(name=f"Trading Away", value=giving_player_string, inline=True)
+            trade_embed.add_field(name="ROS Ranking", value=giving_rank_string, inline=True)
+            trade_embed.add_field(name=f"Trade Value", value=giving_score_string, inline=True)
+            trade_embed.add_field(name='', value=linebreak, inline=False)
+            trade_embed.add_field(name=f"Trading For", value=receiving_player_string, inline=True)
+            trade_embed.add_field(name="ROS Ranking", value=receiving_rank_string, inline=True)
+            trade_embed.add_field(name=f"Trade Value", value=receiving_score_string, inline=True)
+            trade_embed.add_field(name="", value="", inline=False)
+            trade_embed.timestamp = datetime.now()
+            trade_embed.set_footer(text='Trade Analyzer')
         await interaction.followup.send(content=None, embed=trade_embed, ephemeral=True)
 
     except Exception as e:
+        mark_failed(e)
         await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
-async def calculate_trade_value(player1, position, team1, rank1):
-
-    # get rest of year (remaining) projections for players from internet
-    url = requests.get("https://www.numberfire.com/nfl/fantasy/remaining-projections")
-    doc = BeautifulSoup(url.text, "html.parser")
-    player_name = doc.findAll("span", attrs="full")
-    positions = doc.findAll("td", attrs="player")
-    fpts = doc.findAll("td", attrs="nf_fp active")
-    receptions = doc.findAll("td", attrs='rec')
-
-    proj = ''
-    recs = ''
-    i = 0
-    j = 1
-    posCount = 0
-    posSum = 0.0
-    posRank = 0
-    posRange = 12
-    if position == 'WR' or position == 'RB':
-        posRange = 24
-
-    # fix for inconsistency in database
-    if player1 == 'Michael Pittman':
-        player1 = 'Michael Pittman Jr.'
-
-    index = -1
-    for player in player_name:
-        if player1 in player:
-            recs = receptions[i].text.strip()
-            proj = fpts[i].text.strip()
-            posRank = j
-            index = i
-        if position in positions[i].text:
-            if posCount < posRange:
-                posSum += (float(fpts[i].text.strip())) + (float(receptions[i].text.strip()))
-                posCount += 1
-            j += 1
-        i += 1
-
-    # get position rank
-    rank1.append(position + str(posRank))
-
-    # format string
-    if index != -1:
-        start_idx = positions[index].text.rfind('(')
-        end_idx = positions[index].text.rfind(')')
-        content = positions[index].text[start_idx + 1:end_idx]
-        parts = content.split(',')
-        team = parts[1].strip()
-        team1.append(team)
-
-    if proj == '':
-        return -1
-
-    if recs == '':
-        return -1
-
-    proj = (float(proj) + float(recs))
-    posAvg = posSum / posRange
-    offset = 0
-
-    # top 3 qbs and tes, top 6 wrs and rbs
-    if posRank <= (posRange / 4):
-        offset = (proj - posAvg) + (((posRange / 2) - posRank) * 10)
-    # top 8 qbs and tes, top 16 wrs and rbs
-    elif posRank <= (posRange * (2 / 3)):
-        offset = (proj - posAvg) + ((posRange / 2) - posRank)
-    # top 18 qbs and tes, top 36 wrs and rbs
-    elif posRank < (posRange * 1.5):
-        offset += ((proj - posAvg) * 0.8) + (((posRange / 2) - posRank) * 4)
-    # bench players
-    else:
-        offset += ((proj - posAvg) * 0.8) + (((posRange / 2) - posRank) * 2)
-
-    # turn value into a more readable number
-    value = (proj + float(recs) + offset) / 15
-
-    # adjust for qbs getting more points than other positions despite being less valuable
-    if position == 'QB':
-        value = value * 0.75
-    # lowest score a player can have is 1
-    if value < 1:
-        value = 1.00
-    if value:
-        return value
-    else:
-        return -1
-
-
 # autocomplete for trade_analyzer command
 @trade_analyzer.autocomplete('giving1')
 @trade_analyzer.autocomplete('giving2')
@@ -1367,168 +1076,243 @@ async def trade_analyzer_autocomplete(interaction: discord.Interaction, current:
     return await player_autocomplete(interaction, current)
 
 @bot.tree.command(name='breaking_news', description='View recent fantasy football relevant news in the NFL.')
+@measured
 async def breaking_news(interaction: discord.Interaction):
     await interaction.response.defer(thinking=True, ephemeral=True)
 
     try:
-        # get news from internet
-        url = requests.get("https://www.fantasypros.com/nfl/breaking-news.php")
-        doc = BeautifulSoup(url.text, "html.parser")
-        news = doc.findAll("div", attrs='player-news-header')
-
-        # store first 6 news articles
-        i = 0
-        headers = []
-        info = []
-        for x in news:
-            if i == 7:
-                break
-            headers.append(x.text.strip())
-            i += 1
-
-        # format string into two parts, headers and fantasy impact (descriptions)
-        j = 0
-        for header in headers:
-            desc = news[j].parent.text.strip()
-            if "Fantasy Impact" in desc:
-                temp = desc.split("Fantasy Impact: ")
-                info.append(temp[1])
-
-            # get date on a new line
-            match = re.search(r'(Mon|Tue|Wed|Thu|Fri|Sat|Sun), [A-Za-z]{3} \d{1,2}(st|nd|rd|th) \d{1,2}:\d{2}[ap]m', header)
-            if match:
-                date_part = match.group(0)
-                headers[j] = header.replace(date_part, f"\n{date_part}")
-            else:
-                print("date could not be formatted")
-            j += 1
-
-        if len(headers) != 7:
+        # served from the parsed copy of the news page the scheduler keeps up to date
+        news = (await news_feed.latest())[:7]
+        if len(news) != 7:
             await interaction.followup.send(content="There was an issue retrieving the news", ephemeral=True)
-            print(len(headers))
+            print(len(news))
             return
 
         # display news in an embed
+        with timed('embed'):
+            news_embed = discord.Embed(
+                title="Fantasy Football News",
+                description="[More News](https://www.fantasypros.com/nfl/breaking-news.php)",
+                color=discord.Color.dark_magenta())
+            news_embed.set_author(name="Fantasy Football Bot", icon_url="https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png")
+            for item in news:
+                news_embed.add_field(name=item.header, value=item.impact or "No fantasy impact listed.", inline=False)
+            news_embed.timestamp = datetime.now()
+            news_embed.set_footer(text='Breaking News')
+        await interaction.followup.send(content=None, embed=news_embed, ephemeral=True)
+
+    except Exception as e:
+        mark_failed(e)
+        await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+
+# posts news the feed hasn't seen before to every subscribed channel, runs after each scheduled news refresh
+async def post_breaking_news(urls):
+    items = await news_feed.new_items()
+    if not items:
+        return
+    channel_ids = await db.news_channels()
+    for start in range(0, len(items), ITEMS_PER_POST):
         news_embed = discord.Embed(
-            title="Fantasy Football News",
+            title="Breaking News",
             description="[More News](https://www.fantasypros.com/nfl/breaking-news.php)",
             color=discord.Color.dark_magenta())
         news_embed.set_author(name="Fantasy Football Bot", icon_url="https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png")
-        news_embed.add_field(name=headers[0], value=info[0], inline=False)
-        news_embed.add_field(name=headers[1], value=info[1], inline=False)
-        news_embed.add_field(name=headers[2], value=info[2], inline=False)
-        news_embed.add_field(name=headers[3], value=info[3], inline=False)
-        news_embed.add_field(name=headers[4], value=info[4], inline=False)
-        news_embed.add_field(name=headers[5], value=info[5], inline=False)
-        news_embed.add_field(name=headers[6], value=info[6], inline=False)
+        for item in items[start:start + ITEMS_PER_POST]:
+            news_embed.add_field(name=item.header, value=item.impact or "No fantasy impact listed.", inline=False)
         news_embed.timestamp = datetime.now()
         news_embed.set_footer(text='Breaking News')
-        await interaction.followup.send(content=None, embed=news_embed, ephemeral=True)
+        await asyncio.gather(*(send_news(channel_id, news_embed) for channel_id in channel_ids))
+
+async def send_news(channel_id, news_embed):
+    try:
+        channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+        await channel.send(embed=news_embed)
+    except discord.NotFound:
+        # channel was deleted
+        await db.unsubscribe_news(channel_id)
+    except discord.Forbidden as e:
+        # the bot can no longer see or post in the channel, it would fail again on every poll
+        print(f"Unsubscribed {channel_id} from news, the bot can't post there: {e}")
+        await db.unsubscribe_news(channel_id)
+    except discord.HTTPException as e:
+        print(f"Failed to post news to {channel_id}: {e}")
+
+# subscribes the current channel to breaking news, posted as it comes in
+@bot.tree.command(name='subscribe_news', description='Post breaking fantasy football news in this channel as it happens.')
+@measured
+async def subscribe_news(interaction: discord.Interaction):
+    if interaction.guild is None:
+        await interaction.response.send_message("News can only be posted to a server channel.", ephemeral=True)
+        return
+    if not interaction.channel.permissions_for(interaction.user).manage_channels:
+        await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+        return
+
+    try:
+        now = datetime.now()
+        await db.subscribe_news(interaction.channel_id, interaction.guild.id, interaction.user.id, now.strftime("%m/%d/%Y %H:%M:%S"))
+        await interaction.response.send_message("This channel will now get breaking news as it happens. Use /unsubscribe_news to stop.", ephemeral=True)
+    except Exception as e:
+        mark_failed(e)
+        await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
+
+@bot.tree.command(name='unsubscribe_news', description='Stop posting breaking news in this channel.')
+@measured
+async def unsubscribe_news(interaction: discord.Interaction):
+    if interaction.guild is None:
+        await interaction.response.send_message("News can only be posted to a server channel.", ephemeral=True)
+        return
+    if not interaction.channel.permissions_for(interaction.user).manage_channels:
+        await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+        return
 
+    try:
+        if await db.unsubscribe_news(interaction.channel_id):
+            await interaction.response.send_message("This channel will no longer get breaking news.", ephemeral=True)
+        else:
+            await interaction.response.send_message("This channel isn't subscribed to breaking news.", ephemeral=True)
     except Exception as e:
-        await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+        mark_failed(e)
+        await interaction.response.send_message(f"An error occurred: {str(e)}", ephemeral=True)
 
 @bot.tree.command(name="waiver_wire_report", description="View players that are trending up in other fantasy football leagues.")
-async def waiver_wire_report(interaction: discord.Interaction):
+@app_commands.describe(position="Only show players at this position")
+@app_commands.describe(page="Page of trending players to show")
+@app_commands.choices(position=[app_commands.Choice(name=position, value=position) for position in ('QB', 'RB', 'WR', 'TE', 'K', 'DEF')])
+@measured
+async def waiver_wire_report(interaction: discord.Interaction, position: app_commands.Choice[str] = None, page: app_commands.Range[int, 1] = 1):
     await interaction.response.defer(thinking=True, ephemeral=True)
 
     try:
-        # get player trends data from internet
-        url = requests.get("https://fantasy.nfl.com/research/trends")
-        doc = BeautifulSoup(url.text, "html.parser")
-        trends = doc.findAll("td")
-
-        playerStr = []
-        rosterPercent = []
-        startPercent = []
-
-        i = 0
-        j = 2
-        k = 4
-
-        # use offsets to get data into lists
-        for trend in trends:
-            if i > 40:
-                break
+        # served from the snapshot of the trends page the scheduler keeps up to date
+        snapshot = await waiver_trends.latest()
+        players, page_count = snapshot.page(page, position.value if position else None)
+        if not players:
+            if page > page_count:
+                await interaction.followup.send(content=f"There are only {page_count} page(s) of trending players.", ephemeral=True)
             else:
-                playerStr.append(trends[i].text)
-                rosterPercent.append(trends[j].text)
-                startPercent.append(trends[k].text)
-
-                i += 8
-                j += 8
-                k += 8
-
-        dash_index = -1
-        names = []
-        player_info = []
-
-        # split data so player name and team/position are in separate strings
-        for player in playerStr:
-            split_index = -1
-            x = 0
-            for letter in player:
-                if letter == '-':
-                    dash_index = x
-                    split_index = dash_index - 3
-                    names.append(player[:split_index - 1])
-                    player_info.append(player[split_index:].replace(' - ', ' • '))
-                else:
-                    x += 1
-
-        # unpack list into variables
-        name1, name2, name3, name4, name5, name6 = names
-        info1, info2, info3, info4, info5, info6 = player_info
-        rosterPer1, rosterPer2, rosterPer3, rosterPer4, rosterPer5, rosterPer6 = rosterPercent
-        startPer1, startPer2, startPer3, startPer4, startPer5, startPer6 = startPercent
+                await interaction.followup.send(content="There are no trending players at that position right now.", ephemeral=True)
+            return
 
         # display data in an embed
-        trends_embed = discord.Embed(
-            title="Players Trending Up",
-            description="[See All Trends](https://fantasy.nfl.com/research/trends)",
-            color=discord.Color.gold())
-        trends_embed.set_author(name="Fantasy Football Bot",
-                              icon_url="https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png")
-        trends_embed.add_field(name=f"{name1} \t {info1}", value="", inline=False)
-        trends_embed.add_field(name='Rostered %', value=rosterPer1, inline = True)
-        trends_embed.add_field(name='Starting %', value=startPer1, inline=True)
-        trends_embed.add_field(name='', value='--------------------------------', inline=False)
-
-        trends_embed.add_field(name=f"{name2} \t {info2}", value="", inline=False)
-        trends_embed.add_field(name='Rostered %', value=rosterPer2, inline=True)
-        trends_embed.add_field(name='Starting %', value=startPer2, inline=True)
-        trends_embed.add_field(name='', value='--------------------------------', inline=False)
-
-        trends_embed.add_field(name=f"{name3} \t {info3}", value="", inline=False)
-        trends_embed.add_field(name='Rostered %', value=rosterPer3, inline=True)
-        trends_embed.add_field(name='Starting %', value=startPer3, inline=True)
-        trends_embed.add_field(name='', value='--------------------------------', inline=False)
-
-        trends_embed.add_field(name=f"{name4} \t {info4}", value="", inline=False)
-        trends_embed.add_field(name='Rostered %', value=rosterPer4, inline=True)
-        trends_embed.add_field(name='Starting %', value=startPer4, inline=True)
-        trends_embed.add_field(name='', value='--------------------------------', inline=False)
-
-        trends_embed.add_field(name=f"{name5} \t {info5}", value="", inline=False)
-        trends_embed.add_field(name='Rostered %', value=rosterPer5, inline=True)
-        trends_embed.add_field(name='Starting %', value=startPer5, inline=True)
-        trends_embed.add_field(name='', value='--------------------------------', inline=False)
-
-        trends_embed.add_field(name=f"{name6} \t {info6}", value="", inline=False)
-        trends_embed.add_field(name='Rostered %', value=rosterPer6, inline=True)
-        trends_embed.add_field(name='Starting %', value=startPer6, inline=True)
-
-        trends_embed.timestamp = datetime.now()
-        trends_embed.set_footer(text='Waiver Wire Report')
+        with timed('embed'):
+            trends_embed = discord.Embed(
+                title="Players Trending Up" if position is None else f"{position.value}s Trending Up",
+                description="[See All Trends](https://fantasy.nfl.com/research/trends)",
+                color=discord.Color.gold())
+            trends_embed.set_author(name="Fantasy Football Bot",
+                                  icon_url="https://seeklogo.com/images/N/nfl-logo-B2C95E8E88-seeklogo.com.png")
+            for i, player in enumerate(players):
+                if i > 0:
+                    trends_embed.add_field(name='', value='--------------------------------', inline=False)
+                info = f"{player.position} • {player.team}" if player.team else player.position
+                trends_embed.add_field(name=f"{player.name} \t {info}", value="", inline=False)
+                trends_embed.add_field(name='Rostered %', value=player.rostered, inline=True)
+                trends_embed.add_field(name='Starting %', value=player.started, inline=True)
+
+            trends_embed.timestamp = datetime.now()
+            trends_embed.set_footer(text=f'Waiver Wire Report • Page {page} of {page_count}')
         await interaction.followup.send(content=None, embed=trends_embed, ephemeral=True)
 
     except Exception as e:
+        mark_failed(e)
         await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
-# closes the connection when the bot shuts down
-@bot.event
-async def on_disconnect():
-    storage.close()
+# owner only command to reload starting_draftboard.db without restarting the bot
+@bot.tree.command(name='reload_template', description='Reload the starting draft board (bot owner only)')
+@measured
+async def reload_template(interaction: discord.Interaction):
+    if not await bot.is_owner(interaction.user):
+        await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+        return
+
+    players = await template.load()
+    await interaction.response.send_message(f"Starting draft board reloaded with {len(players)} players.", ephemeral=True)
+
+# when the scheduler last refreshed a source, for /cache
+def refresh_status(source):
+    age = scheduler.ages().get(source)
+    if age is None:
+        return "fetched on demand" if source not in SOURCES else "not refreshed yet"
+    failed = scheduler.failures.get(source)
+    return f"refreshed {age / 60:.0f} min ago" + (f" ({failed} failed)" if failed else "")
+
+# owner only command to view what the page cache is holding and optionally flush one source
+@bot.tree.command(name='cache', description='View the page cache or flush one of its sources (bot owner only)')
+@app_commands.describe(flush='Source to remove from the cache')
+@app_commands.choices(flush=[app_commands.Choice(name=source, value=source) for source in list(SOURCES) + [DEFAULT_SOURCE]])
+@measured
+async def cache(interaction: discord.Interaction, flush: app_commands.Choice[str] = None):
+    if not await bot.is_owner(interaction.user):
+        await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+        return
+
+    content = ''
+    if flush:
+        removed = pages.flush(flush.value)
+        content = f"Flushed {removed} page(s) from {flush.value}"
+
+    with timed('embed'):
+        cache_embed = discord.Embed(title="Page Cache", description=f"{pages.total_bytes / 1024:.0f} KB of {pages.max_bytes / 1024:.0f} KB used", color=discord.Color.light_grey())
+        for source, info in pages.stats().items():
+            cache_embed.add_field(
+                name=source,
+                value=f"{info['entries']} pages ({info['expired']} expired) • {info['bytes'] / 1024:.0f} KB\n"
+                      f"{info['hits']} hits • {info['stale']} stale • {info['misses']} misses\n"
+                      f"{refresh_status(source)}",
+                inline=False
+            )
+        cache_embed.timestamp = datetime.now()
+        cache_embed.set_footer(text='Cache')
+    await interaction.response.send_message(content=content or None, embed=cache_embed, ephemeral=True)
+
+# formats a histogram quantile for /bot_stats
+def format_seconds(seconds):
+    if seconds is None:
+        return '—'
+    if seconds == float('inf'):
+        return f">{BUCKETS[-2]:.0f}s"
+    return f"≤{seconds * 1000:.0f}ms" if seconds < 1 else f"≤{seconds:.1f}s"
+
+# owner only command to see which commands are slow and where their time goes
+@bot.tree.command(name='bot_stats', description='View command latency and cache metrics (bot owner only)')
+@measured
+async def bot_stats(interaction: discord.Interaction):
+    if not await bot.is_owner(interaction.user):
+        await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+        return
+
+    with timed('embed'):
+        stats_embed = discord.Embed(title="Command Metrics", description="p50 / p95 by phase since the bot started", color=discord.Color.light_grey())
+        # busiest commands first, an embed holds at most 25 fields and one is the event loop's
+        commands_by_use = sorted(metrics.commands.items(), key=lambda item: item[1].total.count, reverse=True)[:24]
+        for name, command in commands_by_use:
+            phases = " • ".join(
+                f"{phase} {format_seconds(histogram.quantile(0.5))}/{format_seconds(histogram.quantile(0.95))}"
+                for phase, histogram in command.phases.items() if histogram.sum > 0
+            )
+            hits = sum(count for (source, kind), count in command.cache.items() if kind != 'misses')
+            misses = sum(count for (source, kind), count in command.cache.items() if kind == 'misses')
+            cache = f"\ncache {hits} hits • {misses} misses" if hits or misses else ""
+            stats_embed.add_field(
+                name=f"/{name} • {command.total.count} calls • {command.errors} errors",
+                value=f"total {format_seconds(command.total.quantile(0.5))}/{format_seconds(command.total.quantile(0.95))}\n{phases}{cache}",
+                inline=False
+            )
+        if not commands_by_use:
+            stats_embed.description = "No commands have run since the bot started."
+        lag = metrics.loop_lag
+        stalls = "\n".join(f"<t:{int(stall.when)}:R> {stall.describe()}" for stall in list(watchdog.stalls)[-3:])
+        stats_embed.add_field(
+            name=f"Event loop lag • {metrics.loop_stalls} stalls over {watchdog.threshold * 1000:.0f}ms",
+            value=f"p50 {format_seconds(lag.quantile(0.5))} • p95 {format_seconds(lag.quantile(0.95))} • p99 {format_seconds(lag.quantile(0.99))} • "
+                  f"max {watchdog.max_lag * 1000:.0f}ms" + (f"\n{stalls}" if stalls else ""),
+            inline=False
+        )
+        stats_embed.timestamp = datetime.now()
+        stats_embed.set_footer(text='Bot Stats')
+    await interaction.response.send_message(embed=stats_embed, ephemeral=True)
 
-# runs the bot
-bot.run(TOKEN)
\ No newline at end of file
+# runs the bot (bench_commands.py imports this module without starting it)
+if __name__ == '__main__':
+    bot.run(TOKEN)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import re
+from player_index import PlayerIndex, tokenize
+
+# 'Player Name -> 12' (also accepts → and =>)
+MOVE_LINE = re.compile(r"^(.+?)\s*(?:→|->|=>)\s*#?(\d+)\s*$")
+# leading '12.' or '12)' numbering on a pasted list
+LIST_NUMBER = re.compile(r"^\s*\d+\s*[.)]\s*")
+# trailing '(WR)' on draft board names
+POSITION_SUFFIX = re.compile(r"\s*\([A-Z/]+\)\s*$")
+
+
+def name_tokens(name):
+    return tokenize(POSITION_SUFFIX.sub('', name))
+
+
+# matches what a user typed to a player on their board: exact name first, then word prefixes ('cmc' won't work, 'c mccaff' will)
+class NameResolver:
+    def __init__(self, draft_board):
+        self.players = list(draft_board)
+        self.tokens = [name_tokens(player[0]) for player in self.players]
+        self.exact = {}
+        for player, tokens in zip(self.players, self.tokens):
+            self.exact.setdefault(' '.join(tokens), []).append(player)
+
+    # returns (player, None) or (None, reason)
+    def resolve(self, text):
+        query = name_tokens(text)
+        if not query:
+            return None, f"'{text}' isn't a player name"
+        matches = self.exact.get(' '.join(query))
+        if not matches:
+            matches = [player for player, tokens in zip(self.players, self.tokens) if PlayerIndex.matches(tokens, query)]
+        if not matches:
+            return None, f"couldn't find '{text}' on your board"
+        if len(matches) > 1:
+            options = ', '.join(player[0] for player in matches[:3])
+            return None, f"'{text}' could be {options}"
+        return matches[0], None
+
+
+# applies a pasted ordered list or a batch of 'name -> rank' moves to a board in one pass
+# returns (new board, errors); the board is only returned when every line could be applied
+def apply_bulk_edit(draft_board, text):
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if not lines:
+        return None, ["Nothing to apply."]
+
+    resolver = NameResolver(draft_board)
+    moves = [MOVE_LINE.match(line) for line in lines]
+    errors = []
+
+    if all(moves):
+        targets = {}
+        for line, move in zip(lines, moves):
+            player, error = resolver.resolve(move.group(1))
+            rank = int(move.group(2))
+            if error:
+                errors.append(error)
+            elif not 1 <= rank <= len(draft_board):
+                errors.append(f"{rank} isn't a rank between 1 and {len(draft_board)}")
+            elif rank in targets:
+                errors.append(f"{targets[rank][0]} and {player[0]} are both moving to {rank}")
+            elif player in targets.values():
+                errors.append(f"{player[0]} is being moved more than once")
+            else:
+                targets[rank] = player
+        if errors:
+            return None, errors
+
+        # everyone not being moved keeps their order and fills the ranks the moved players don't take
+        moving = set(targets.values())
+        remaining = iter([player for player in draft_board if player not in moving])
+        return [targets[rank] if rank in targets else next(remaining) for rank in range(1, len(draft_board) + 1)], []
+
+    if any(moves):
+        return None, ["Use either a list of players or 'name -> rank' moves, not both."]
+
+    # ordered list: listed players go to the top in that order, the rest keep their order below them
+    listed = []
+    seen = set()
+    for line in lines:
+        player, error = resolver.resolve(LIST_NUMBER.sub('', line))
+        if error:
+            errors.append(error)
+        elif player in seen:
+            errors.append(f"{player[0]} is listed more than once")
+        else:
+            seen.add(player)
+            listed.append(player)
+    if errors:
+        return None, errors
+    return listed + [player for player in draft_board if player not in seen], []
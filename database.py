@@ -0,0 +1,382 @@
+import asyncio
+import struct
+import aiosqlite
+from phases import in_phase
+from season_stats import LAST_SEASON, STAT_FIELDS, POSITION_STATS, to_number
+from player_index import rank_number
+
+DATABASE = 'draft_board.db'
+STARTING_DATABASE = 'starting_draftboard.db'
+
+# one row per player per season loaded by get_lastyear.py, stats a position's page doesn't have are NULL, as is everything for rookies
+# the primary key doubles as the (player, season) index
+def player_seasons_table(name):
+    return f'''
+        CREATE TABLE IF NOT EXISTS {name} (
+            player TEXT NOT NULL,
+            season INTEGER NOT NULL,
+            position TEXT NOT NULL,
+            team TEXT,
+            rank INTEGER,
+            games_played INTEGER,
+            points_per_game REAL,
+            pass_yards INTEGER,
+            pass_tds INTEGER,
+            interceptions INTEGER,
+            rush_attempts INTEGER,
+            rush_yards INTEGER,
+            rush_tds INTEGER,
+            targets INTEGER,
+            receptions INTEGER,
+            receiving_yards INTEGER,
+            receiving_tds INTEGER,
+            PRIMARY KEY (player, season, position)
+        )
+    '''
+
+# one row per table an ingest script replaces, version goes up in the same transaction as every reload
+# rowids can't show a reload: rows deleted and inserted again get the same rowids back
+INGESTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS ingests (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL
+    )
+'''
+BUMP_INGEST = "INSERT INTO ingests (name, version) VALUES (?, 1) ON CONFLICT (name) DO UPDATE SET version = version + 1"
+
+PLAYER_SEASONS_INDEX = "CREATE INDEX IF NOT EXISTS player_seasons_by_position ON player_seasons (position, season, rank)"
+
+# every column of player_seasons after the key, in table order
+SEASON_COLUMNS = ('team', 'rank', 'games_played', 'points_per_game', 'pass_yards', 'pass_tds', 'interceptions',
+                  'rush_attempts', 'rush_yards', 'rush_tds', 'targets', 'receptions', 'receiving_yards', 'receiving_tds')
+
+
+# draft boards are stored as player ids packed into little endian unsigned 32 bit ints
+def pack_ids(ids):
+    return struct.pack(f'<{len(ids)}I', *ids)
+
+def unpack_ids(blob):
+    return struct.unpack(f'<{len(blob) // 4}I', blob)
+
+
+# builds '?, ?, ?' for an IN (...) lookup
+def placeholders(values):
+    return ', '.join('?' for _ in values)
+
+
+# every query the bot makes goes through here; aiosqlite runs them on its own threads so the event loop never waits on the disk
+# reads and writes use separate connections so, with WAL, a slow save never holds up a lookup
+class Database:
+    def __init__(self, path=DATABASE):
+        self.path = path
+        self.reader = None
+        self.writer = None
+        self.write_lock = asyncio.Lock()
+        # id <-> name for every player that has ever been on a draft board
+        self.player_ids = {}
+        self.player_names = {}
+
+    async def connect(self):
+        # statements are cached per connection, so reusing the same sql strings reuses their prepared statements
+        self.writer = await aiosqlite.connect(self.path, cached_statements=256)
+        await self.writer.execute("PRAGMA journal_mode=WAL")
+        await self.writer.execute("PRAGMA synchronous=NORMAL")
+        await self.create_tables()
+        self.reader = await aiosqlite.connect(self.path, cached_statements=256)
+
+    async def close(self):
+        for connection in (self.reader, self.writer):
+            if connection is not None:
+                await connection.close()
+        self.reader = None
+        self.writer = None
+
+    # ensure the necessary tables exist
+    async def create_tables(self):
+        await self.writer.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY,
+                username TEXT NOT NULL,
+                date TEXT
+            )
+        ''')
+        await self.writer.execute('''
+            CREATE TABLE IF NOT EXISTS board_players (
+                id INTEGER PRIMARY KEY,
+                player TEXT NOT NULL UNIQUE
+            )
+        ''')
+        # one row per user, version goes up every time the board is saved
+        await self.writer.execute('''
+            CREATE TABLE IF NOT EXISTS draft_boards (
+                user_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL,
+                players BLOB NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users (user_id)
+            )
+        ''')
+        # channels that get breaking news posted to them
+        await self.writer.execute('''
+            CREATE TABLE IF NOT EXISTS news_subscriptions (
+                channel_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                subscribed_by INTEGER NOT NULL,
+                date TEXT
+            )
+        ''')
+        # hashes of news items that have already been posted, so a restart doesn't post them again
+        await self.writer.execute('''
+            CREATE TABLE IF NOT EXISTS news_seen (
+                item_hash TEXT PRIMARY KEY,
+                seen_at REAL NOT NULL
+            )
+        ''')
+        # filled by get_schedule.py
+        await self.writer.execute('''
+            CREATE TABLE IF NOT EXISTS schedules (
+                home_team TEXT,
+                away_team TEXT,
+                time TEXT,
+                date TEXT,
+                week TEXT,
+                id INTEGER PRIMARY KEY AUTOINCREMENT
+            )
+        ''')
+        await self.writer.execute(player_seasons_table('player_seasons'))
+        await self.writer.execute(INGESTS_TABLE)
+        await self.writer.execute(PLAYER_SEASONS_INDEX)
+        async with self.writer.execute("SELECT id, player FROM board_players") as cursor:
+            for player_id, player in await cursor.fetchall():
+                self.player_ids[player] = player_id
+                self.player_names[player_id] = player
+        await self.migrate_draft_board()
+        await self.writer.commit()
+        await self.migrate_season_stats()
+
+    # copies boards from the old table (one row per player) into draft_boards, then drops it
+    async def migrate_draft_board(self):
+        async with self.writer.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='draft_board'") as cursor:
+            if await cursor.fetchone() is None:
+                return
+
+        async with self.writer.execute("SELECT user_id, player FROM draft_board ORDER BY user_id, ranking") as cursor:
+            rows = await cursor.fetchall()
+        boards = {}
+        for user_id, player in rows:
+            boards.setdefault(int(user_id), []).append(player)
+
+        added = {}
+        try:
+            for user_id, board in boards.items():
+                ids, board_added = await self.ids_for(board)
+                added.update(board_added)
+                await self.writer.execute('''
+                    INSERT OR IGNORE INTO draft_boards (user_id, version, players)
+                    VALUES (?, 1, ?)
+                ''', (user_id, pack_ids(ids)))
+            await self.writer.execute("DROP TABLE draft_board")
+            await self.writer.commit()
+            self.remember_ids(added)
+        except Exception:
+            await self.writer.rollback()
+            raise
+        print(f"Migrated {len(boards)} draft board(s) to packed storage")
+
+    # copies what can be recovered from the old last_year_stats table (one season, every value stored as text)
+    # into player_seasons, then drops it, so commands keep working without get_lastyear.py being run first
+    # 'Total TDs' can't be split back into rushing and receiving, those columns stay NULL until the season is loaded again
+    async def migrate_season_stats(self):
+        async with self.writer.execute("PRAGMA table_info(last_year_stats)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if not columns:
+            return
+        async with self.writer.execute("SELECT 1 FROM player_seasons LIMIT 1") as cursor:
+            if await cursor.fetchone() is not None:
+                return
+
+        # copies from before team and position were stored only have the position in the ranking ('QB12')
+        team = 'team' if 'team' in columns else 'NULL'
+        position = 'position' if 'position' in columns else 'NULL'
+        async with self.writer.execute(f'''
+            SELECT player, ranking, points_per_game, games_played, stat1, stat2, stat3, stat4, stat5, stat6, {team}, {position}
+            FROM last_year_stats
+        ''') as cursor:
+            legacy = await cursor.fetchall()
+
+        rows = []
+        for player, ranking, ppg, games_played, *stats, team, position in legacy:
+            position = position or (ranking or '')[:2]
+            if position not in POSITION_STATS:
+                continue
+            fields = {}
+            for parts, stat in zip(POSITION_STATS[position], stats):
+                if len(parts) == 1:
+                    fields[parts[0]] = to_number(stat or '')
+            rank = rank_number(ranking)
+            rows.append((player, LAST_SEASON, position, team, rank if rank != float('inf') else None,
+                         to_number(games_played or ''), to_number(ppg or ''), *[fields.get(field) for field in STAT_FIELDS]))
+
+        columns = ('player', 'season', 'position') + SEASON_COLUMNS
+        try:
+            await self.writer.executemany(f'''
+                INSERT OR IGNORE INTO player_seasons ({', '.join(columns)}) VALUES ({placeholders(columns)})
+            ''', rows)
+            await self.writer.execute(BUMP_INGEST, ('player_seasons',))
+            await self.writer.execute("DROP TABLE last_year_stats")
+            await self.writer.commit()
+        except Exception:
+            await self.writer.rollback()
+            raise
+        print(f"Migrated {len(rows)} player(s) from last_year_stats to player_seasons, "
+              f"run get_lastyear.py to fill in the touchdowns that were only stored as totals")
+
+    # ids for a list of player names, adding any names that haven't been seen before (call with the write lock held)
+    # also returns the ids it added, which only go into player_ids / player_names through remember_ids() once the
+    # transaction has committed: a rolled back insert frees its ids for sqlite to give to other names
+    async def ids_for(self, players):
+        new_players = [player for player in dict.fromkeys(players) if player not in self.player_ids]
+        added = {}
+        if new_players:
+            await self.writer.executemany("INSERT OR IGNORE INTO board_players (player) VALUES (?)", [(player,) for player in new_players])
+            async with self.writer.execute(f"SELECT id, player FROM board_players WHERE player IN ({placeholders(new_players)})", new_players) as cursor:
+                for player_id, player in await cursor.fetchall():
+                    added[player] = player_id
+        return [added[player] if player in added else self.player_ids[player] for player in players], added
+
+    def remember_ids(self, added):
+        for player, player_id in added.items():
+            self.player_ids[player] = player_id
+            self.player_names[player_id] = player
+
+    @in_phase('database')
+    async def fetch_all(self, query, parameters=()):
+        async with self.reader.execute(query, parameters) as cursor:
+            return await cursor.fetchall()
+
+    @in_phase('database')
+    async def fetch_one(self, query, parameters=()):
+        async with self.reader.execute(query, parameters) as cursor:
+            return await cursor.fetchone()
+
+    # fingerprint of player_seasons so the autocomplete index is only rebuilt after get_lastyear.py reloads it
+    # (the ingest version it bumps on every reload, None before the first one)
+    async def players_fingerprint(self):
+        return await self.fetch_one("SELECT version FROM ingests WHERE name='player_seasons'")
+
+    # (player, ranking) from each player's latest season, rankings look like 'RB12' ('RB--' for rookies)
+    async def player_rankings(self):
+        return await self.fetch_all('''
+            SELECT player, position || COALESCE(rank, '--') FROM player_seasons AS latest
+            WHERE season = (SELECT MAX(season) FROM player_seasons WHERE player = latest.player)
+        ''')
+
+    # position of each player (from their latest season) in one query, players that aren't in the database are left out
+    async def fetch_positions(self, players):
+        players = list(dict.fromkeys(players))
+        rows = await self.fetch_all(
+            f"SELECT player, position FROM player_seasons WHERE player IN ({placeholders(players)}) ORDER BY season DESC",
+            players
+        )
+        positions = {}
+        for player, position in rows:
+            positions.setdefault(player, position)
+        return positions
+
+    # a player's row for one season as {'position': ..., 'team': ..., 'rank': ..., ...}, None if they have no row for it
+    async def fetch_season_stats(self, player, season):
+        row = await self.fetch_one(f'''
+            SELECT position, {', '.join(SEASON_COLUMNS)} FROM player_seasons
+            WHERE player=? AND season=? ORDER BY rank IS NULL LIMIT 1
+        ''', (player, season))
+        if row is None:
+            return None
+        return dict(zip(('position',) + SEASON_COLUMNS, row))
+
+    # fingerprint of schedules so the schedule index is only rebuilt after get_schedule.py reloads it
+    async def schedule_fingerprint(self):
+        return await self.fetch_one("SELECT COUNT(*), MAX(id) FROM schedules")
+
+    # every game as (home, away, time, date, week) in the order get_schedule.py stored them
+    async def fetch_schedule(self):
+        return await self.fetch_all("SELECT home_team, away_team, time, date, week FROM schedules ORDER BY id")
+
+    # read starting draft board
+    async def load_starting(self):
+        async with aiosqlite.connect(f"file:{STARTING_DATABASE}?mode=ro", uri=True) as starting_storage:
+            async with starting_storage.execute("SELECT player FROM players") as cursor:
+                return await cursor.fetchall()
+
+    # load existing draftboard as (player,) rows in ranked order
+    async def load_existing(self, user_id):
+        row = await self.fetch_one("SELECT players FROM draft_boards WHERE user_id=?", (user_id,))
+        if row is None:
+            return []
+        return [(self.player_names[player_id],) for player_id in unpack_ids(row[0])]
+
+    # saves user information, time, and draft board as a single row write
+    @in_phase('database')
+    async def save_board(self, user_id, username, time_saved, draft_board):
+        async with self.write_lock:
+            try:
+                ids, added = await self.ids_for([player[0] for player in draft_board])
+                await self.writer.execute('''
+                    INSERT INTO users (user_id, username, date)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET username = excluded.username, date = excluded.date
+                ''', (user_id, username, time_saved))
+                await self.writer.execute('''
+                    INSERT INTO draft_boards (user_id, version, players)
+                    VALUES (?, 1, ?)
+                    ON CONFLICT(user_id) DO UPDATE SET version = draft_boards.version + 1, players = excluded.players
+                ''', (user_id, pack_ids(ids)))
+                await self.writer.commit()
+                self.remember_ids(added)
+            except Exception:
+                await self.writer.rollback()
+                raise
+
+    # deletes existing draft board from database
+    @in_phase('database')
+    async def delete_board(self, user_id):
+        async with self.write_lock:
+            await self.writer.execute("DELETE FROM draft_boards WHERE user_id=?", (user_id,))
+            await self.writer.execute("DELETE FROM users WHERE user_id=?", (user_id,))
+            await self.writer.commit()
+
+    # adds or moves a channel's breaking news subscription
+    @in_phase('database')
+    async def subscribe_news(self, channel_id, guild_id, user_id, date):
+        async with self.write_lock:
+            await self.writer.execute('''
+                INSERT INTO news_subscriptions (channel_id, guild_id, subscribed_by, date)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(channel_id) DO UPDATE SET subscribed_by = excluded.subscribed_by, date = excluded.date
+            ''', (channel_id, guild_id, user_id, date))
+            await self.writer.commit()
+
+    # returns whether the channel was subscribed
+    @in_phase('database')
+    async def unsubscribe_news(self, channel_id):
+        async with self.write_lock:
+            cursor = await self.writer.execute("DELETE FROM news_subscriptions WHERE channel_id=?", (channel_id,))
+            await self.writer.commit()
+            return cursor.rowcount > 0
+
+    async def news_channels(self):
+        return [row[0] for row in await self.fetch_all("SELECT channel_id FROM news_subscriptions")]
+
+    async def seen_news(self):
+        return [row[0] for row in await self.fetch_all("SELECT item_hash FROM news_seen")]
+
+    # records newly seen items and forgets all but the newest keep hashes
+    async def mark_news_seen(self, item_hashes, seen_at, keep):
+        async with self.write_lock:
+            await self.writer.executemany("INSERT OR IGNORE INTO news_seen (item_hash, seen_at) VALUES (?, ?)", [(item_hash, seen_at) for item_hash in item_hashes])
+            await self.writer.execute('''
+                DELETE FROM news_seen WHERE item_hash NOT IN (
+                    SELECT item_hash FROM news_seen ORDER BY seen_at DESC LIMIT ?
+                )
+            ''', (keep,))
+            await self.writer.commit()
+
+db = Database()
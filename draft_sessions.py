@@ -0,0 +1,52 @@
+import re
+from collections import OrderedDict
+
+# a draft board view is dropped after this many seconds without a click
+IDLE_TIMEOUT = 15 * 60
+
+# most draft board views kept in memory at once, the least recently used ones are stopped first
+MAX_SESSIONS = 200
+
+
+# live draft board views by user, one per user and at most MAX_SESSIONS in total
+# a stopped view's buttons keep working: clicks fall through to the persistent views registered at startup,
+# which rebuild the session from the database
+class SessionStore:
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.views = OrderedDict()
+
+    def __len__(self):
+        return len(self.views)
+
+    def track(self, user_id, view):
+        old_view = self.views.pop(user_id, None)
+        if old_view is not None and old_view is not view:
+            old_view.stop()
+        self.views[user_id] = view
+        while len(self.views) > self.max_sessions:
+            _, oldest_view = self.views.popitem(last=False)
+            oldest_view.stop()
+
+    def touch(self, user_id):
+        if user_id in self.views:
+            self.views.move_to_end(user_id)
+
+    def release(self, user_id, view):
+        if self.views.get(user_id) is view:
+            del self.views[user_id]
+
+
+# first rank shown in a draft board message, used to put a rebuilt view back on the page the user was looking at
+def first_rank_shown(content):
+    match = re.search(r"^(\d+)\. ", content or '', re.MULTILINE)
+    return int(match.group(1)) if match else 1
+
+
+# the player a rebuilt edit view should have selected, if the message shows one
+def moving_player_shown(content):
+    match = re.search(r"^Currently moving: (.+)$", content or '', re.MULTILINE)
+    return match.group(1) if match else None
+
+
+sessions = SessionStore()
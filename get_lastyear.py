@@ -1,375 +1,104 @@
+import argparse
+import asyncio
 import sqlite3
-import requests
-from bs4 import BeautifulSoup
-
-# create table if it doesnt exist
-with sqlite3.connect("draft_board.db") as storage:
-    cursor = storage.cursor()
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS last_year_stats (
-    player TEXT,
-    ranking TEXT,
-    points_per_game TEXT,
-    games_played TEXT,
-    stat1 TEXT,
-    stat2 TEXT,
-    stat3 TEXT,
-    stat4 TEXT,
-    stat5 TEXT,
-    stat6 TEXT
-    )
-    ''')
-
-
-# QBs
-qb_url = requests.get("https://www.cbssports.com/fantasy/football/stats/QB/2023/season/stats/ppr/")
-docQB = BeautifulSoup(qb_url.text, "html.parser")
-playersQB = docQB.findAll("span", attrs="CellPlayerName--long")
-statsQB = docQB.findAll("td", attrs="TableBase-bodyTd")
-
-# format stats
-games_played_qb = []
-ppgQB = []
-stat1_qb = []
-stat2_qb = []
-stat3_qb = []
-stat4_qb = []
-stat5_qb = []
-stat6_qb = []
-
-j = 1
-for stat in statsQB:
-    if j % 16 == 0:
-        ppgQB.append(stat.text.strip())
-    if j == 2:
-        games_played_qb.append(stat.text.strip())
-    elif (j-2) % 16 == 0:
-        games_played_qb.append(stat.text.strip())
-
-    if j == 5:
-        stat1_qb.append(stat.text.strip())
-    elif (j-5) % 16 == 0:
-        stat1_qb.append(stat.text.strip())
-
-    if j == 7:
-        stat2_qb.append(stat.text.strip())
-    elif(j-7) % 16 == 0:
-        stat2_qb.append(stat.text.strip())
-
-    if j == 8:
-        stat3_qb.append(stat.text.strip())
-    elif(j-8) % 16 == 0:
-        stat3_qb.append(stat.text.strip())
-
-    if j == 10:
-        stat4_qb.append(stat.text.strip())
-    elif(j-10) % 16 == 0:
-        stat4_qb.append(stat.text.strip())
-
-    if j == 11:
-        stat5_qb.append(stat.text.strip())
-    elif (j-11) % 16 == 0:
-        stat5_qb.append(stat.text.strip())
-
-    if j == 13:
-        stat6_qb.append(stat.text.strip())
-    elif (j-13) % 16 == 0:
-        stat6_qb.append(stat.text.strip())
-    j += 1
-
-# upload info to database
-with sqlite3.connect('draft_board.db') as storage:
-    i = 1
-    cursor = storage.cursor()
-    for player in playersQB:
-        player_name = player.text.strip().split("\n")[0]
-        qb_ranking = "QB" + str(i)
-        cursor.execute('''
-        INSERT INTO last_year_stats (player, ranking, points_per_game, games_played, stat1, stat2, stat3, stat4, stat5, stat6)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (player_name, qb_ranking, ppgQB[i-1], games_played_qb[i-1], stat1_qb[i-1], stat2_qb[i-1], stat3_qb[i-1], stat4_qb[i-1], stat5_qb[i-1], stat6_qb[i-1]))
-        i += 1
-    storage.commit()
-
-# add rookies to database (no stats last year)
-rookie_qbs = ["Caleb Williams", "Jayden Daniels", "Bo Nix", "Drake Maye", "J.J. McCarthy", "Michael Penix Jr.", "Spencer Rattler"]
-with sqlite3.connect('draft_board.db') as storage:
-    cursor = storage.cursor()
-    for rookie in rookie_qbs:
-        qb_ranking = "QB--"
-        cursor.execute('''
-        INSERT INTO last_year_stats (player, ranking)
-        VALUES (?, ?)
-        ''', (rookie, qb_ranking))
-    storage.commit()
-
-print("QB stats have been uploaded")
-
-
-
-# RBs
-rb_url = requests.get("https://www.cbssports.com/fantasy/football/stats/RB/2023/season/stats/ppr/")
-docRB = BeautifulSoup(rb_url.text, "html.parser")
-playersRB = docRB.findAll("span", attrs="CellPlayerName--long")
-statsRB = docRB.findAll("td", attrs="TableBase-bodyTd")
-
-# format stats
-games_played_rb = []
-ppgRB = []
-stat1_rb = []
-stat2_rb = []
-stat3_rb = []
-stat4_rb = []
-stat5_rb = []
-stat6_rb = []
-add_stat3_rb = []
-j = 1
-for stat in statsRB:
-    if j % 15 == 0:
-        ppgRB.append(stat.text.strip())
-
-    if j == 2:
-        games_played_rb.append(stat.text.strip())
-    elif (j-2) % 15 == 0:
-        games_played_rb.append(stat.text.strip())
-
-    if j == 3:
-        stat1_rb.append(stat.text.strip())
-    elif (j-3) % 15 == 0:
-        stat1_rb.append(stat.text.strip())
-
-    if j == 4:
-        stat2_rb.append(stat.text.strip())
-    elif(j-4) % 15 == 0:
-        stat2_rb.append(stat.text.strip())
-
-    if j == 6:
-        stat3_rb.append(stat.text.strip())
-    elif(j-6) % 15 == 0:
-        stat3_rb.append(stat.text.strip())
-
-    if j == 7:
-        stat4_rb.append(stat.text.strip())
-    elif(j-7) % 15 == 0:
-        stat4_rb.append(stat.text.strip())
-
-    if j == 8:
-        stat5_rb.append(stat.text.strip())
-    elif (j-8) % 15 == 0:
-        stat5_rb.append(stat.text.strip())
-
-    if j == 9:
-        stat6_rb.append(stat.text.strip())
-    elif (j-9) % 15 == 0:
-        stat6_rb.append(stat.text.strip())
-
-    if j == 12:
-        add_stat3_rb.append(stat.text.strip())
-    elif (j-12) % 15 == 0:
-        add_stat3_rb.append(stat.text.strip())
-    j += 1
-
-# total tds (receiving and rushing)
-for i in range(0, len(stat3_rb)):
-    if '—' in stat3_rb[i] or '—' in add_stat3_rb[i]:
-        continue
-    stat3_rb[i] = str(int(stat3_rb[i]) + int(add_stat3_rb[i]))
-
-# upload info to database
-with sqlite3.connect('draft_board.db') as storage:
-    i = 1
-    cursor = storage.cursor()
-    for player in playersRB:
-        player_name = player.text.strip().split("\n")[0]
-        rb_ranking = "RB" + str(i)
-        cursor.execute('''
-        INSERT INTO last_year_stats (player, ranking, points_per_game, games_played, stat1, stat2, stat3, stat4, stat5, stat6)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (player_name, rb_ranking, ppgRB[i-1], games_played_rb[i-1], stat1_rb[i-1], stat2_rb[i-1], stat3_rb[i-1], stat4_rb[i-1], stat5_rb[i-1], stat6_rb[i-1]))
-        i += 1
-    storage.commit()
-
-rookie_rbs = ["Jonathon Brooks", "Trey Benson", "Blake Corum", "Jaylen Wright", "MarShawn Lloyd", "Ray Davis", "Audric Estime", "Bucky Irving", "Braelon Allen", "Will Shipley"]
-with sqlite3.connect('draft_board.db') as storage:
-    cursor = storage.cursor()
-    for rookie in rookie_rbs:
-        rb_ranking = "RB--"
-        cursor.execute('''
-        INSERT INTO last_year_stats (player, ranking)
-        VALUES (?, ?)
-        ''', (rookie, rb_ranking))
-    storage.commit()
-
-print("RB stats have been uploaded")
-    
-
-
-# WRs
-wr_url = requests.get("https://www.cbssports.com/fantasy/football/stats/WR/2023/season/stats/ppr/")
-docWR = BeautifulSoup(wr_url.text, "html.parser")
-playersWR = docWR.findAll("span", attrs="CellPlayerName--long")
-statsWR = docWR.findAll("td", attrs="TableBase-bodyTd")
-
-# format stats
-
-games_played_wr = []
-ppgWR = []
-stat1_wr = []
-stat2_wr = []
-stat3_wr = []
-stat4_wr = []
-stat5_wr = []
-stat6_wr = []
-add_stat4_wr = []
-j = 1
-for stat in statsWR:
-    if j % 15 == 0:
-        ppgWR.append(stat.text.strip())
-
-    if j == 2:
-        games_played_wr.append(stat.text.strip())
-    elif (j-2) % 15 == 0:
-        games_played_wr.append(stat.text.strip())
-
-    if j == 3:
-        stat1_wr.append(stat.text.strip())
-    elif (j-3) % 15 == 0:
-        stat1_wr.append(stat.text.strip())
-
-    if j == 4:
-        stat2_wr.append(stat.text.strip())
-    elif(j-4) % 15 == 0:
-        stat2_wr.append(stat.text.strip())
-
-    if j == 5:
-        stat3_wr.append(stat.text.strip())
-    elif(j-5) % 15 == 0:
-        stat3_wr.append(stat.text.strip())
-
-    if j == 8:
-        stat4_wr.append(stat.text.strip())
-    elif(j-8) % 15 == 0:
-        stat4_wr.append(stat.text.strip())
-
-    if j == 9:
-        stat5_wr.append(stat.text.strip())
-    elif (j-9) % 15 == 0:
-        stat5_wr.append(stat.text.strip())
-
-    if j == 10:
-        stat6_wr.append(stat.text.strip())
-    elif (j-10) % 15 == 0:
-        stat6_wr.append(stat.text.strip())
-
-    if j == 12:
-        add_stat4_wr.append(stat.text.strip())
-    elif (j-12) % 15 == 0:
-        add_stat4_wr.append(stat.text.strip())
-    j += 1
-
-for i in range(0, len(stat4_wr)):
-    if '—' in stat4_wr[i] or '—' in add_stat4_wr[i]:
-        continue
-    stat4_wr[i] = str(int(stat4_wr[i]) + int(add_stat4_wr[i]))
-
-# upload info to database
-with sqlite3.connect('draft_board.db') as storage:
-    i = 1
-    cursor = storage.cursor()
-    for player in playersWR:
-        player_name = player.text.strip().split("\n")[0]
-        wr_ranking = "WR" + str(i)
-        cursor.execute('''
-        INSERT INTO last_year_stats (player, ranking, points_per_game, games_played, stat1, stat2, stat3, stat4, stat5, stat6)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (player_name, wr_ranking, ppgWR[i-1], games_played_wr[i-1], stat1_wr[i-1], stat2_wr[i-1], stat3_wr[i-1], stat4_wr[i-1], stat5_wr[i-1], stat6_wr[i-1]))
-        i += 1
-    storage.commit()
-
-rookie_wrs = ["Marvin Harrison Jr.", "Malik Nabers", "Rome Odunze", "Xavier Worthy", "Brian Thomas Jr.", "Ladd McConkey", "Keon Coleman", "Ricky Pearsall", "Adonai Mitchell", "Xavier Legette", "Ja'Lynn Polk", "Roman Wilson", "Malachi Corley"]
-with sqlite3.connect('draft_board.db') as storage:
-    cursor = storage.cursor()
-    for rookie in rookie_wrs:
-        wr_ranking = "WR--"
-        cursor.execute('''
-        INSERT INTO last_year_stats (player, ranking)
-        VALUES (?, ?)
-        ''', (rookie, wr_ranking))
-    storage.commit()
-
-print("WR stats have been uploaded")
-    
-
-
-
-# TEs
-te_url = requests.get("https://www.cbssports.com/fantasy/football/stats/TE/2023/season/stats/ppr/")
-docTE = BeautifulSoup(te_url.text, "html.parser")
-playersTE = docTE.findAll("span", attrs="CellPlayerName--long")
-statsTE = docTE.findAll("td", attrs="TableBase-bodyTd")
-
-# format stats
-
-games_played_te = []
-ppgTE = []
-stat1_te = []
-stat2_te = []
-stat3_te = []
-stat4_te = []
-j = 1
-for stat in statsTE:
-    if j % 11 == 0:
-        ppgTE.append(stat.text.strip())
-
-    if j == 2:
-        games_played_te.append(stat.text.strip())
-    elif (j-2) % 11 == 0:
-        games_played_te.append(stat.text.strip())
-
-    if j == 3:
-        stat1_te.append(stat.text.strip())
-    elif (j-3) % 11 == 0:
-        stat1_te.append(stat.text.strip())
-
-    if j == 4:
-        stat2_te.append(stat.text.strip())
-    elif(j-4) % 11 == 0:
-        stat2_te.append(stat.text.strip())
-
-    if j == 5:
-        stat3_te.append(stat.text.strip())
-    elif(j-5) % 11 == 0:
-        stat3_te.append(stat.text.strip())
-
-    if j == 8:
-        stat4_te.append(stat.text.strip())
-    elif(j-8) % 11 == 0:
-        stat4_te.append(stat.text.strip())
-    j += 1
-
-# upload info to database
-with sqlite3.connect('draft_board.db') as storage:
-    i = 1
-    cursor = storage.cursor()
-    for player in playersTE:
-        player_name = player.text.strip().split("\n")[0]
-        te_ranking = "TE" + str(i)
-        cursor.execute('''
-        INSERT INTO last_year_stats (player, ranking, points_per_game, games_played, stat1, stat2, stat3, stat4)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (player_name, te_ranking, ppgTE[i-1], games_played_te[i-1], stat1_te[i-1], stat2_te[i-1], stat3_te[i-1], stat4_te[i-1]))
-        i += 1
-    storage.commit()
-
-rookie_tes = ["Brock Bowers", "Ben Sinnott", "Ja'Tavion Sanders", "Theo Johnson", "Cade Stover", "Erick All Jr."]
-with sqlite3.connect('draft_board.db') as storage:
-    cursor = storage.cursor()
-    for rookie in rookie_tes:
-        te_ranking = "TE--"
-        cursor.execute('''
-        INSERT INTO last_year_stats (player, ranking)
-        VALUES (?, ?)
-        ''', (rookie, te_ranking))
-    storage.commit()
-
-print("TE stats have been uploaded")
\ No newline at end of file
+from http_client import fetch_text, close_session
+from season_stats import SEASON_STATS_URL, LAST_SEASON, STAT_FIELDS, parse_season_table
+from player_index import rank_number
+from database import DATABASE, SEASON_COLUMNS, player_seasons_table, PLAYER_SEASONS_INDEX, INGESTS_TABLE, BUMP_INGEST
+
+POSITIONS = ['QB', 'RB', 'WR', 'TE']
+
+# rookies (no stats the season before they were drafted) so they can still be found by the commands
+# they are stored under ROOKIE_SEASON with no stats whenever that season is loaded
+ROOKIE_SEASON = LAST_SEASON
+ROOKIES = {
+    'QB': ["Caleb Williams", "Jayden Daniels", "Bo Nix", "Drake Maye", "J.J. McCarthy", "Michael Penix Jr.", "Spencer Rattler"],
+    'RB': ["Jonathon Brooks", "Trey Benson", "Blake Corum", "Jaylen Wright", "MarShawn Lloyd", "Ray Davis", "Audric Estime", "Bucky Irving", "Braelon Allen", "Will Shipley"],
+    'WR': ["Marvin Harrison Jr.", "Malik Nabers", "Rome Odunze", "Xavier Worthy", "Brian Thomas Jr.", "Ladd McConkey", "Keon Coleman", "Ricky Pearsall", "Adonai Mitchell", "Xavier Legette", "Ja'Lynn Polk", "Roman Wilson", "Malachi Corley"],
+    'TE': ["Brock Bowers", "Ben Sinnott", "Ja'Tavion Sanders", "Theo Johnson", "Cade Stover", "Erick All Jr."],
+}
+
+STAGING_TABLE = 'player_seasons_staging'
+COLUMNS = ('player', 'season', 'position') + SEASON_COLUMNS
+
+
+# downloads every position's page for every season at once
+async def fetch_pages(seasons):
+    keys = [(season, position) for season in seasons for position in POSITIONS]
+    try:
+        htmls = await asyncio.gather(*(fetch_text(SEASON_STATS_URL.format(position=position, year=season)) for season, position in keys))
+    finally:
+        await close_session()
+    return dict(zip(keys, htmls))
+
+
+# player_seasons rows for one position's page, as tuples in COLUMNS order
+def position_rows(html, season, position):
+    rows = parse_season_table(html, position)
+    if not rows:
+        raise ValueError(f"No {position} stats found on the {season} page, the table layout may have changed")
+    return [
+        (row.name, season, position, row.team, rank_number(row.rank), row.games_played, row.ppg,
+         *[row.fields.get(field) for field in STAT_FIELDS])
+        for row in rows.values()
+    ]
+
+
+# loads everything into the staging table, then replaces the loaded seasons with it in one transaction
+# so the bot never reads a half loaded season, a failed run leaves the stored stats untouched and other seasons are kept
+def load(rows, seasons):
+    # autocommit mode, so the transactions below are exactly the ones written out
+    with sqlite3.connect(DATABASE, isolation_level=None) as storage:
+        storage.execute("PRAGMA journal_mode=WAL")
+        storage.execute(player_seasons_table('player_seasons'))
+        storage.execute(PLAYER_SEASONS_INDEX)
+        storage.execute(INGESTS_TABLE)
+        storage.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        storage.execute(player_seasons_table(STAGING_TABLE))
+
+        storage.execute("BEGIN")
+        # a name listed twice keeps its latest row
+        storage.executemany(f'''
+            INSERT INTO {STAGING_TABLE} ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})
+            ON CONFLICT (player, season, position) DO UPDATE SET {', '.join(f'{column}=excluded.{column}' for column in SEASON_COLUMNS)}
+        ''', rows)
+        # rookies who already played keep their stats
+        if ROOKIE_SEASON in seasons:
+            storage.executemany(f'''
+                INSERT INTO {STAGING_TABLE} (player, season, position) VALUES (?, ?, ?)
+                ON CONFLICT (player, season, position) DO NOTHING
+            ''', [(rookie, ROOKIE_SEASON, position) for position, rookies in ROOKIES.items() for rookie in rookies])
+        storage.execute("COMMIT")
+
+        storage.execute("BEGIN IMMEDIATE")
+        try:
+            storage.execute(f"DELETE FROM player_seasons WHERE season IN ({', '.join('?' for _ in seasons)})", seasons)
+            storage.execute(f"INSERT INTO player_seasons ({', '.join(COLUMNS)}) SELECT {', '.join(COLUMNS)} FROM {STAGING_TABLE}")
+            storage.execute(f"DROP TABLE {STAGING_TABLE}")
+            # tells the running bot to rebuild its autocomplete index
+            storage.execute(BUMP_INGEST, ('player_seasons',))
+            # stats from before they were stored typed and by season, replaced by player_seasons
+            storage.execute("DROP TABLE IF EXISTS last_year_stats")
+            storage.execute("COMMIT")
+        except Exception:
+            storage.execute("ROLLBACK")
+            raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load season stats from cbssports into player_seasons")
+    parser.add_argument('seasons', nargs='*', type=int, default=[LAST_SEASON], help=f"seasons to load (default {LAST_SEASON})")
+    seasons = list(dict.fromkeys(parser.parse_args().seasons))
+
+    htmls = asyncio.run(fetch_pages(seasons))
+    rows = []
+    for (season, position), html in htmls.items():
+        position_stats = position_rows(html, season, position)
+        rows += position_stats
+        print(f"{season} {position} stats: {len(position_stats)} players")
+    load(rows, seasons)
+    print(f"Stats for {', '.join(map(str, seasons))} have been uploaded")
+
+
+if __name__ == '__main__':
+    main()
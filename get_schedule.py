@@ -172,16 +172,15 @@ times.append("trash")
 times.append("trash")
 times.append("trash")
 
-# upload to database
+# upload to database, replacing any earlier run's schedule in the same transaction so rerunning doesn't add every game twice
+# the bot notices the new rows and rebuilds its schedule index
 with sqlite3.connect("draft_board.db") as storage:
-    i = 0
     cursor = storage.cursor()
-    for days in duplicated_days:
-        cursor.execute('''
-        INSERT INTO schedules (home_team, away_team, time, date, week)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (abbr_home[i], abbr_away[i], central_times[i], days, duplicated_weeks[i]))
-        i += 1
+    cursor.execute("DELETE FROM schedules")
+    cursor.executemany('''
+    INSERT INTO schedules (home_team, away_team, time, date, week)
+    VALUES (?, ?, ?, ?, ?)
+    ''', [(abbr_home[i], abbr_away[i], central_times[i], days, duplicated_weeks[i]) for i, days in enumerate(duplicated_days)])
     storage.commit()
     print("Schedules have been uploaded")
 
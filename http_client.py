@@ -0,0 +1,41 @@
+import aiohttp
+
+# limits for the shared connection pool
+POOL_SIZE = 32
+POOL_SIZE_PER_HOST = 8
+KEEPALIVE_SECONDS = 60
+TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5)
+
+# some of the sites refuse requests without a browser-like user agent
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36',
+}
+
+_session = None
+
+# returns the shared session, creating it on first use (aiohttp handles gzip and, with Brotli installed, br)
+def get_session():
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_SIZE,
+            limit_per_host=POOL_SIZE_PER_HOST,
+            keepalive_timeout=KEEPALIVE_SECONDS,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(connector=connector, headers=HEADERS, timeout=TIMEOUT)
+    return _session
+
+# downloads a page and returns its html without blocking the event loop
+async def fetch_text(url):
+    session = get_session()
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.text()
+
+# closes the shared session when the bot shuts down
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from phases import active_tasks, command_task_factory
+from metrics import metrics
+
+# how often the heartbeat asks the loop to wake it up, and how late that can be before it counts as the loop being blocked
+# discord wants an interaction answered within 3 seconds, so anything near a quarter of that is worth knowing about
+LAG_INTERVAL = 0.1
+LAG_THRESHOLD = 0.25
+# frames kept from the blocked stack, innermost last
+STACK_DEPTH = 15
+RECENT_STALLS = 20
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# one time the loop was blocked: where, by which command and for how long (filled in once the loop gets going again)
+class Stall:
+    def __init__(self, command, phase, location, stack):
+        self.when = time.time()
+        self.command = command
+        self.phase = phase
+        self.location = location
+        self.stack = stack
+        self.seconds = None
+
+    def describe(self):
+        command = f"/{self.command} ({self.phase or 'embed'})" if self.command else "no command"
+        blocked = f"{self.seconds:.2f}s" if self.seconds is not None else "still blocked"
+        return f"{blocked} in {command} at {self.location}"
+
+
+# the innermost frame in the bot's own code, which is the handler doing the blocking even when a library is what's slow
+def project_frame(frame):
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(PROJECT_DIR):
+            return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "outside the bot's code"
+
+
+# measures event loop lag with a heartbeat task, and a thread that looks at the loop's stack while it is blocked
+# the heartbeat can only measure a stall after it is over, so the thread is what catches the code responsible in the act
+class LoopWatchdog:
+    def __init__(self, interval=LAG_INTERVAL, threshold=LAG_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = deque(maxlen=RECENT_STALLS)
+        self.max_lag = 0.0
+        self.beat = None
+        self.loop = None
+        self.loop_thread = None
+        self.stall = None
+        self.heartbeat_task = None
+        self.stopping = threading.Event()
+        # so a stall the thread is recording can't be missed by a heartbeat that is just finishing
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.heartbeat_task is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        # so tasks a command starts can be traced back to it when they're the ones blocking
+        if self.loop.get_task_factory() is None:
+            self.loop.set_task_factory(command_task_factory)
+        self.beat = time.perf_counter()
+        self.stopping.clear()
+        self.heartbeat_task = self.loop.create_task(self.heartbeat())
+        threading.Thread(target=self.watch, name='loop-watchdog', daemon=True).start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+
+    async def heartbeat(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - start - self.interval)
+            with self.lock:
+                self.beat = now
+                stall, self.stall = self.stall, None
+            metrics.loop_lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if stall is not None:
+                stall.seconds = lag
+                metrics.loop_stalls += 1
+                print(f"Event loop blocked for {stall.describe()}\n{''.join(stall.stack)}")
+
+    # runs in its own thread, so it keeps going while the loop is stuck
+    def watch(self):
+        while not self.stopping.wait(self.interval / 2):
+            with self.lock:
+                if self.stall is not None or time.perf_counter() - self.beat - self.interval < self.threshold:
+                    continue
+                self.stall = self.capture()
+                self.stalls.append(self.stall)
+
+    # what the loop thread is running right now
+    def capture(self):
+        frame = sys._current_frames().get(self.loop_thread)
+        stack = traceback.format_stack(frame)[-STACK_DEPTH:] if frame is not None else []
+        location = project_frame(frame)
+        timer, phase = active_tasks.get(asyncio.current_task(self.loop), (None, None))
+        if timer is None:
+            # a task started before the factory was installed, only attributed when a single command is running
+            running = {timer for timer, _ in list(active_tasks.values())}
+            if len(running) == 1:
+                timer = running.pop()
+        command = timer.command if timer is not None else None
+        return Stall(command, phase, location, stack)
+
+
+watchdog = LoopWatchdog()
@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import os
+from page_cache import pages
+from phases import PHASES, timing, timed
+
+# histogram bucket upper bounds in seconds, the last bucket catches everything slower
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# where the prometheus text file is written and how often
+METRICS_FILE = os.getenv('METRICS_FILE', 'metrics.prom')
+METRICS_INTERVAL = 60
+
+
+# cumulative bucket counts like a prometheus histogram, so memory stays fixed however many commands run
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += seconds
+        self.count += 1
+
+    # upper bound of the bucket holding the q quantile, good enough to tell 50ms from 2s
+    def quantile(self, q):
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(BUCKETS, self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return bound
+        return BUCKETS[-1]
+
+
+class CommandMetrics:
+    def __init__(self):
+        self.total = Histogram()
+        self.phases = {phase: Histogram() for phase in PHASES}
+        self.errors = 0
+        # (source, 'hits' | 'stale' | 'misses') -> count
+        self.cache = {}
+
+
+# prometheus lines for one histogram, labels is the part inside the braces without le
+def histogram_lines(name, labels, histogram):
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(BUCKETS, histogram.counts):
+        cumulative += bucket_count
+        le = '+Inf' if bound == float('inf') else repr(bound)
+        lines.append(f'{name}_bucket{{{labels + "," if labels else ""}le="{le}"}} {cumulative}')
+    suffix = f'{{{labels}}}' if labels else ''
+    lines.append(f'{name}_sum{suffix} {histogram.sum:.6f}')
+    lines.append(f'{name}_count{suffix} {histogram.count}')
+    return lines
+
+
+# per command histograms and counters, fed by every command wrapped with measured
+# plus event loop lag, fed by the loop watchdog
+class Metrics:
+    def __init__(self):
+        self.commands = {}
+        self.loop_lag = Histogram()
+        self.loop_stalls = 0
+
+    def record(self, timer):
+        command = self.commands.setdefault(timer.command, CommandMetrics())
+        command.total.observe(timer.total())
+        for phase, seconds in timer.breakdown().items():
+            command.phases[phase].observe(seconds)
+        if timer.error is not None:
+            command.errors += 1
+        for event, event_count in timer.counts.items():
+            command.cache[event] = command.cache.get(event, 0) + event_count
+
+    # prometheus text exposition format
+    def prometheus_text(self):
+        lines = [
+            '# HELP fantasybot_command_seconds Time spent by slash commands, by phase',
+            '# TYPE fantasybot_command_seconds histogram',
+        ]
+        for name, command in sorted(self.commands.items()):
+            for phase, histogram in [('total', command.total)] + list(command.phases.items()):
+                lines += histogram_lines('fantasybot_command_seconds', f'command="{name}",phase="{phase}"', histogram)
+
+        lines += ['# HELP fantasybot_command_errors_total Commands that ended in an error', '# TYPE fantasybot_command_errors_total counter']
+        for name, command in sorted(self.commands.items()):
+            lines.append(f'fantasybot_command_errors_total{{command="{name}"}} {command.errors}')
+
+        lines += ['# HELP fantasybot_command_cache_total Page cache lookups made by commands', '# TYPE fantasybot_command_cache_total counter']
+        for name, command in sorted(self.commands.items()):
+            for (source, kind), event_count in sorted(command.cache.items()):
+                lines.append(f'fantasybot_command_cache_total{{command="{name}",source="{source}",result="{kind}"}} {event_count}')
+
+        lines += ['# HELP fantasybot_page_cache_total Page cache lookups from commands and background refreshes', '# TYPE fantasybot_page_cache_total counter']
+        for source, info in pages.stats().items():
+            for kind in ('hits', 'stale', 'misses'):
+                lines.append(f'fantasybot_page_cache_total{{source="{source}",result="{kind}"}} {info[kind]}')
+        lines += ['# HELP fantasybot_page_cache_bytes Memory used by cached pages', '# TYPE fantasybot_page_cache_bytes gauge']
+        for source, info in pages.stats().items():
+            lines.append(f'fantasybot_page_cache_bytes{{source="{source}"}} {info["bytes"]}')
+
+        lines += ['# HELP fantasybot_loop_lag_seconds How late the event loop ran a timer it was given', '# TYPE fantasybot_loop_lag_seconds histogram']
+        lines += histogram_lines('fantasybot_loop_lag_seconds', '', self.loop_lag)
+        lines += ['# HELP fantasybot_loop_stalls_total Times the event loop was blocked past the watchdog threshold', '# TYPE fantasybot_loop_stalls_total counter',
+                  f'fantasybot_loop_stalls_total {self.loop_stalls}']
+        return '\n'.join(lines) + '\n'
+
+    # writes to a temporary file first so a scraper never reads a half written file
+    async def write_prometheus(self, path=METRICS_FILE):
+        text = self.prometheus_text()
+
+        def write():
+            with open(path + '.tmp', 'w') as metrics_file:
+                metrics_file.write(text)
+            os.replace(path + '.tmp', path)
+        await asyncio.to_thread(write)
+
+
+metrics = Metrics()
+
+
+# what a command sends through interaction.response, timed as its 'send' phase
+class TimedResponse:
+    def __init__(self, response):
+        self.wrapped = response
+
+    # anything that isn't a send (is_done, ...) goes straight to the real response
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+    async def defer(self, *args, **kwargs):
+        with timed('send'):
+            return await self.wrapped.defer(*args, **kwargs)
+
+    async def send_message(self, *args, **kwargs):
+        with timed('send'):
+            return await self.wrapped.send_message(*args, **kwargs)
+
+    async def edit_message(self, *args, **kwargs):
+        with timed('send'):
+            return await self.wrapped.edit_message(*args, **kwargs)
+
+    async def send_modal(self, *args, **kwargs):
+        with timed('send'):
+            return await self.wrapped.send_modal(*args, **kwargs)
+
+
+class TimedFollowup:
+    def __init__(self, followup):
+        self.wrapped = followup
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+    async def send(self, *args, **kwargs):
+        with timed('send'):
+            return await self.wrapped.send(*args, **kwargs)
+
+
+# the interaction a measured command is given: the real one, except that its response and followup sends are timed
+class TimedInteraction:
+    def __init__(self, interaction):
+        self.wrapped = interaction
+        self.response = TimedResponse(interaction.response)
+        self.followup = TimedFollowup(interaction.followup)
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+
+# times a slash command callback by phase and records it in metrics, goes under the @bot.tree.command decorators
+def measured(command):
+    @functools.wraps(command)
+    async def wrapper(interaction, *args, **kwargs):
+        with timing(command.__name__) as timer:
+            try:
+                return await command(TimedInteraction(interaction), *args, **kwargs)
+            except Exception as e:
+                timer.error = e
+                raise
+            finally:
+                timer.finish()
+                metrics.record(timer)
+    return wrapper
@@ -0,0 +1,73 @@
+import hashlib
+import re
+import time
+from collections import namedtuple
+from database import db
+from page_cache import pages
+from parsing import parse, NEWS_ITEMS
+from refresh_scheduler import NEWS_URL
+
+# how many seen item hashes are kept, far more than the news page ever shows at once
+MAX_SEEN = 2000
+
+# items per posted message, keeps each embed well under discord's 6000 character limit
+ITEMS_PER_POST = 5
+
+NEWS_DATE = re.compile(r'(Mon|Tue|Wed|Thu|Fri|Sat|Sun), [A-Za-z]{3} \d{1,2}(st|nd|rd|th) \d{1,2}:\d{2}[ap]m')
+
+# header has the date on its own line, impact is the 'Fantasy Impact' text or '' if the item has none
+NewsItem = namedtuple('NewsItem', ['item_hash', 'header', 'impact'])
+
+
+# hash of the header text, which holds the player, the headline and when it was posted
+def item_hash(header):
+    return hashlib.sha1(' '.join(header.split()).encode()).hexdigest()
+
+
+# every item on the news page, newest first
+def parse_news(html):
+    doc = parse(html, NEWS_ITEMS)
+    items = []
+    for news_item in doc.find_all("div", class_='player-news-item'):
+        news_header = news_item.find("div", class_='player-news-header')
+        if news_header is None:
+            continue
+        header = news_header.text.strip()
+        desc = news_item.text.strip()
+        impact = desc.split("Fantasy Impact: ")[1] if "Fantasy Impact" in desc else ''
+
+        # get date on a new line
+        match = NEWS_DATE.search(header)
+        display_header = header.replace(match.group(0), f"\n{match.group(0)}") if match else header
+        items.append(NewsItem(item_hash(header), display_header, impact))
+    return items
+
+
+# parsed news from the cached page, plus the index of items that have already been posted
+class NewsFeed:
+    def __init__(self):
+        self.seen = set()
+
+    async def load(self):
+        self.seen = set(await db.seen_news())
+
+    async def latest(self):
+        return await pages.parsed(NEWS_URL, parse_news)
+
+    # items on the page that haven't been seen before, oldest first, marking them seen
+    # the first time the feed is read everything on the page is marked seen without being returned,
+    # so subscribing (or a fresh database) doesn't post a backlog of old news
+    async def new_items(self):
+        first_run = not self.seen
+        items = await self.latest()
+        fresh = [item for item in items if item.item_hash not in self.seen]
+        if not fresh:
+            return []
+        self.seen.update(item.item_hash for item in fresh)
+        await db.mark_news_seen([item.item_hash for item in fresh], time.time(), MAX_SEEN)
+        if len(self.seen) > MAX_SEEN:
+            self.seen = set(await db.seen_news())
+        return [] if first_run else fresh[::-1]
+
+
+news_feed = NewsFeed()
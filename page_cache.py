@@ -0,0 +1,212 @@
+import asyncio
+import sys
+import time
+import types
+from collections import OrderedDict
+from http_client import fetch_text
+from phases import in_phase, count
+from parsing import parse_in_thread
+
+# upstream sources matched by url prefix, with how long (in seconds) a downloaded page stays fresh
+SOURCES = {
+    'news': ('https://www.fantasypros.com/nfl/breaking-news.php', 5 * 60),
+    'projections': ('https://www.fantasypros.com/nfl/projections/', 30 * 60),
+    'boom_bust': ('https://www.fantasypros.com/nfl/reports/', 60 * 60),
+    'season_stats': ('https://www.cbssports.com/fantasy/football/stats/', 30 * 60),
+    'ros_projections': ('https://www.numberfire.com/nfl/fantasy/remaining-projections', 60 * 60),
+    'trends': ('https://fantasy.nfl.com/research/trends', 15 * 60),
+}
+DEFAULT_SOURCE = 'other'
+DEFAULT_TTL = 10 * 60
+
+# total memory the cached pages and their parsed results are allowed to use before the least recently used ones are dropped
+MAX_BYTES = 64 * 1024 * 1024
+
+
+# rough memory held by a parsed result: every container, string and object reachable from it, each counted once
+# classes and modules are shared with the rest of the bot, so they aren't counted
+def estimate_size(value):
+    seen = set()
+    stack = [value]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, types.ModuleType, types.FunctionType)):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            stack.append(vars(item))
+    return size
+
+
+# runs in the parser thread so measuring a big result doesn't hold up the loop either
+def parse_and_measure(parser, html, *args):
+    result = parser(html, *args)
+    return result, estimate_size(result)
+
+
+# parsed holds (parser, args) -> parse task for results built from this copy of the page,
+# a new download makes a new entry so parsed results always match the html they were built from
+# size is the html plus an estimate of every parsed result kept for it
+class CacheEntry:
+    __slots__ = ('text', 'source', 'size', 'fetched_at', 'expires_at', 'parsed')
+
+    def __init__(self, text, source, ttl):
+        self.text = text
+        self.parsed = {}
+        self.source = source
+        self.size = sys.getsizeof(text)
+        self.fetched_at = time.monotonic()
+        self.expires_at = self.fetched_at + ttl
+
+
+# url keyed LRU cache of downloaded pages
+# concurrent misses share one download and expired pages are served while a background refresh runs
+class PageCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.counters = {}
+
+    # finds which source a url belongs to and its ttl
+    def source_for(self, url):
+        for source, (prefix, ttl) in SOURCES.items():
+            if url.startswith(prefix):
+                return source, ttl
+        return DEFAULT_SOURCE, DEFAULT_TTL
+
+    def count(self, source, kind):
+        counts = self.counters.setdefault(source, {'hits': 0, 'stale': 0, 'misses': 0})
+        counts[kind] += 1
+        count((source, kind))
+
+    # returns the html for a url, downloading it only if it has never been cached
+    @in_phase('fetch')
+    async def get(self, url):
+        entry = self.entries.get(url)
+        if entry is not None:
+            self.entries.move_to_end(url)
+            if time.monotonic() >= entry.expires_at:
+                self.count(entry.source, 'stale')
+                if url not in self.in_flight:
+                    self.start_fetch(url)
+            else:
+                self.count(entry.source, 'hits')
+            return entry.text
+
+        self.count(self.source_for(url)[0], 'misses')
+        task = self.in_flight.get(url)
+        if task is None:
+            task = self.start_fetch(url)
+        # shield so one cancelled interaction doesn't cancel the download other callers are waiting on
+        return await asyncio.shield(task)
+
+    # parser(html, *args) for a url's page, run off the event loop once per download and shared by every caller
+    # results live on the cache entry, so they're rebuilt when the page is downloaded again and dropped when it is evicted
+    async def parsed(self, url, parser, *args):
+        html = await self.get(url)
+        entry = self.entries.get(url)
+        if entry is None or entry.text is not html:
+            # too big to cache, or replaced while this caller was waiting: parse this copy without keeping it
+            return await parse_in_thread(parser, html, *args)
+
+        key = (parser, args)
+        task = entry.parsed.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.parse_entry(url, entry, parser, args))
+            entry.parsed[key] = task
+            # a failed parse is tried again by the next caller instead of failing every caller until the next download
+            task.add_done_callback(lambda done: entry.parsed.pop(key, None) if done.cancelled() or done.exception() else None)
+        # shield so one cancelled interaction doesn't cancel the parse other callers are waiting on
+        return await asyncio.shield(task)
+
+    # parses an entry's page and counts the result toward the entry's size while the entry is still cached
+    async def parse_entry(self, url, entry, parser, args):
+        result, size = await parse_in_thread(parse_and_measure, parser, entry.text, *args)
+        if self.entries.get(url) is entry:
+            entry.size += size
+            self.total_bytes += size
+            self.evict()
+        return result
+
+    # downloads a url again even if the cached copy is still fresh
+    async def refresh(self, url):
+        task = self.in_flight.get(url)
+        if task is None:
+            task = self.start_fetch(url)
+        return await asyncio.shield(task)
+
+    def start_fetch(self, url):
+        task = asyncio.create_task(self.fetch(url))
+        self.in_flight[url] = task
+        task.add_done_callback(lambda done: self.fetch_done(url, done))
+        return task
+
+    def fetch_done(self, url, task):
+        if self.in_flight.get(url) is task:
+            del self.in_flight[url]
+        # background refreshes have nobody awaiting them, so failures are logged here and the stale copy is kept
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Failed to refresh {url}: {task.exception()}")
+
+    async def fetch(self, url):
+        text = await fetch_text(url)
+        self.store(url, text)
+        return text
+
+    def store(self, url, text):
+        source, ttl = self.source_for(url)
+        entry = CacheEntry(text, source, ttl)
+        self.remove(url)
+        if entry.size > self.max_bytes:
+            return
+        self.entries[url] = entry
+        self.total_bytes += entry.size
+        self.evict()
+
+    # drops the least recently used entries until everything fits
+    def evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            oldest_url = next(iter(self.entries))
+            self.remove(oldest_url)
+
+    def remove(self, url):
+        entry = self.entries.pop(url, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    # every cached url from one source
+    def urls(self, source):
+        return [url for url, entry in self.entries.items() if entry.source == source]
+
+    # removes every cached page from one source and returns how many were dropped
+    def flush(self, source):
+        urls = self.urls(source)
+        for url in urls:
+            self.remove(url)
+        return len(urls)
+
+    # summary of entries, memory and hit rates for each source
+    def stats(self):
+        now = time.monotonic()
+        summary = {}
+        for source in list(SOURCES) + [DEFAULT_SOURCE]:
+            summary[source] = {'entries': 0, 'bytes': 0, 'expired': 0, 'hits': 0, 'stale': 0, 'misses': 0}
+            summary[source].update(self.counters.get(source, {}))
+        for entry in self.entries.values():
+            summary[entry.source]['entries'] += 1
+            summary[entry.source]['bytes'] += entry.size
+            if now >= entry.expires_at:
+                summary[entry.source]['expired'] += 1
+        return summary
+
+
+pages = PageCache()
@@ -0,0 +1,38 @@
+import asyncio
+from bs4 import BeautifulSoup, SoupStrainer
+from phases import timed
+
+# lxml builds the tree several times faster than python's html.parser, which is still used if lxml isn't installed
+try:
+    import lxml
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+
+# strainer class filter matching any of names, strainers see the raw class string ('TableBase-bodyTd TableBase-bodyTd--number')
+# so a plain class_='TableBase-bodyTd' would miss every cell with a second class
+def any_class(*names):
+    names = set(names)
+    return lambda value: value is not None and not names.isdisjoint(value.split() if isinstance(value, str) else value)
+
+
+# parts of each scraped page the bot reads, anything outside them is never built into the tree
+# an element that matches keeps everything inside it, so cells nested in a matched row or name spans in a matched cell are still there
+# the season table is kept whole, its header rows are what tell the stats apart
+SEASON_TABLE = SoupStrainer('table', class_=any_class('TableBase-table'))
+ROS_TABLE = SoupStrainer(['td', 'span'], class_=any_class('player', 'nf_fp', 'rec', 'full'))
+# each news item keeps its header and the 'Fantasy Impact' text after it
+NEWS_ITEMS = SoupStrainer('div', class_=any_class('player-news-item'))
+TABLE_ROWS = SoupStrainer('tr')
+
+
+# runs a page parser off the event loop, counted as the running command's parse time
+async def parse_in_thread(parser, *args):
+    with timed('parse'):
+        return await asyncio.to_thread(parser, *args)
+
+
+# parses html with the fastest parser available, only building the parts matched by only (the whole page if None)
+def parse(html, only=None):
+    return BeautifulSoup(html, PARSER, parse_only=only)
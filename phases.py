@@ -0,0 +1,150 @@
+import asyncio
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+
+# where a command's time goes, 'embed' is building the reply (its embed, or a draft board's view and message)
+# time in none of them (the command's own logic, waiting on a lock) only shows up in the total
+PHASES = ('fetch', 'parse', 'database', 'embed', 'send')
+
+
+# time spent in each phase by one command invocation
+# tasks a command starts (gather, to_thread) copy the context, so their time is added to the same timer
+# each phase is the wall clock time it covered, so two pages parsing at once count once, but different phases
+# can still overlap each other (one page parsing while another downloads)
+class CommandTimer:
+    def __init__(self, command):
+        self.command = command
+        self.started = time.perf_counter()
+        self.finished = None
+        self.intervals = {}
+        self.counts = {}
+        self.error = None
+
+    def add(self, phase, start, end):
+        self.intervals.setdefault(phase, []).append((start, end))
+
+    # seconds covered by the union of a phase's intervals
+    def covered(self, phase):
+        seconds = 0.0
+        reach = None
+        for start, end in sorted(self.intervals.get(phase, ())):
+            if reach is None or start >= reach:
+                seconds += end - start
+                reach = end
+            elif end > reach:
+                seconds += end - reach
+                reach = end
+        return seconds
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    def total(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    # seconds per phase
+    def breakdown(self):
+        return {phase: self.covered(phase) for phase in PHASES}
+
+
+current_timer = contextvars.ContextVar('current_timer', default=None)
+# the phase the running code is in, each task a command starts gets its own copy so concurrent phases don't overwrite each other
+current_phase = contextvars.ContextVar('current_phase', default=None)
+
+# task -> (timer, phase) of every task working for a command: the command's own task and every task it started
+# context variables can't be read from another thread, so this is how the loop watchdog finds out
+# which command and phase were running when the loop stalled
+active_tasks = {}
+
+
+def running_task():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+
+# task factory that registers tasks started inside a command (gather, create_task) under its timer and current phase
+# installed by the loop watchdog, a task is dropped from active_tasks once it finishes
+def command_task_factory(loop, coro, context=None):
+    task = asyncio.Task(coro, loop=loop, context=context)
+    if context is None:
+        timer, phase = current_timer.get(), current_phase.get()
+    else:
+        timer, phase = context.get(current_timer), context.get(current_phase)
+    if timer is not None:
+        active_tasks[task] = (timer, phase)
+        task.add_done_callback(lambda done: active_tasks.pop(done, None))
+    return task
+
+
+# times a command and everything it awaits, the timer is returned once the block exits
+# inside a block that is already timing (a benchmark timing a command), the outer timer keeps collecting
+@contextmanager
+def timing(command):
+    if current_timer.get() is not None:
+        yield current_timer.get()
+        return
+    timer = CommandTimer(command)
+    token = current_timer.set(timer)
+    task = running_task()
+    if task is not None:
+        active_tasks[task] = (timer, None)
+    try:
+        yield timer
+    finally:
+        timer.finish()
+        current_timer.reset(token)
+        active_tasks.pop(task, None)
+
+
+# adds the block's time to a phase of the running command, does nothing outside a command
+@contextmanager
+def timed(phase):
+    timer = current_timer.get()
+    if timer is None:
+        yield
+        return
+    token = current_phase.set(phase)
+    task = running_task()
+    previous = active_tasks.get(task)
+    if task is not None:
+        active_tasks[task] = (timer, phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(phase, start, time.perf_counter())
+        current_phase.reset(token)
+        if previous is not None:
+            active_tasks[task] = previous
+        else:
+            active_tasks.pop(task, None)
+
+
+# decorator version of timed for async functions
+def in_phase(phase):
+    def decorate(function):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            with timed(phase):
+                return await function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# counts something that happened during the running command, like a page cache hit
+def count(event):
+    timer = current_timer.get()
+    if timer is not None:
+        timer.counts[event] = timer.counts.get(event, 0) + 1
+
+
+# marks the running command as failed, for commands that catch their own errors and reply with a message
+def mark_failed(error):
+    timer = current_timer.get()
+    if timer is not None:
+        timer.error = error
@@ -0,0 +1,76 @@
+import re
+from bisect import bisect_left
+
+MAX_RESULTS = 20
+
+
+# lowercases and drops punctuation so 'aj' finds 'A.J.' and 'jamarr' finds "Ja'Marr"
+def tokenize(text):
+    tokens = []
+    for token in text.casefold().split():
+        token = re.sub(r"[^\w]", "", token)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+# positional rank from a ranking like 'RB12', rookies ('RB--') sort after everyone ranked
+def rank_number(ranking):
+    digits = re.sub(r"\D", "", ranking or '')
+    return int(digits) if digits else float('inf')
+
+
+# in memory prefix index over player names, ranked by positional rank
+class PlayerIndex:
+    def __init__(self):
+        self.rebuild([])
+
+    # rows are (player, ranking) pairs, the whole index is replaced at once
+    def rebuild(self, rows):
+        best = {}
+        for player, ranking in rows:
+            if player and (player not in best or rank_number(ranking) < best[player]):
+                best[player] = rank_number(ranking)
+
+        # a player's id is their position in rank order, so smaller ids are better players
+        names = sorted(best, key=lambda player: (best[player], player))
+        name_tokens = [tokenize(name) for name in names]
+        entries = sorted((token, player_id) for player_id, tokens in enumerate(name_tokens) for token in set(tokens))
+
+        self.data = (names, name_tokens, [token for token, _ in entries], [player_id for _, player_id in entries])
+
+    def __len__(self):
+        return len(self.data[0])
+
+    # every query token has to start a different word of the name, in the same order
+    @staticmethod
+    def matches(name_tokens, query_tokens):
+        i = 0
+        for token in name_tokens:
+            if token.startswith(query_tokens[i]):
+                i += 1
+                if i == len(query_tokens):
+                    return True
+        return False
+
+    # best ranked players matching a first name, last name or multi word prefix
+    def search(self, query, limit=MAX_RESULTS):
+        names, name_tokens, tokens, ids = self.data
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return names[:limit]
+
+        first = query_tokens[0]
+        start = bisect_left(tokens, first)
+        end = bisect_left(tokens, first + '\uffff', start)
+
+        results = []
+        for player_id in sorted(set(ids[start:end])):
+            if self.matches(name_tokens[player_id], query_tokens):
+                results.append(names[player_id])
+                if len(results) == limit:
+                    break
+        return results
+
+
+player_index = PlayerIndex()
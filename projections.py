@@ -0,0 +1,115 @@
+from collections import namedtuple
+import numpy as np
+from page_cache import pages
+from parsing import parse, ROS_TABLE
+
+ROS_URL = "https://www.numberfire.com/nfl/fantasy/remaining-projections"
+
+# how many starters at each position are averaged to get that position's baseline
+STARTER_COUNTS = {'QB': 12, 'RB': 24, 'WR': 24, 'TE': 12}
+DEFAULT_STARTER_COUNT = 12
+
+# fix for names that are spelled differently in our database
+NAME_FIXES = {
+    'Michael Pittman': 'Michael Pittman Jr.',
+}
+
+Projection = namedtuple('Projection', ['team', 'rank', 'value'])
+
+
+# rest of season projections parsed once, with every player's trade value precomputed
+class ProjectionTable:
+    def __init__(self, names, positions, teams, points, receptions):
+        self.positions = positions
+        self.teams = teams
+        self.index = {name: i for i, name in enumerate(names)}
+        self.ranks = np.zeros(len(names), dtype=np.int64)
+        self.values = np.zeros(len(names), dtype=np.float64)
+
+        position_array = np.array(positions, dtype=object)
+        points = np.asarray(points, dtype=np.float64)
+        receptions = np.asarray(receptions, dtype=np.float64)
+        proj = points + receptions
+
+        for position in set(positions):
+            rows = np.flatnonzero(position_array == position)
+            pos_range = STARTER_COUNTS.get(position, DEFAULT_STARTER_COUNT)
+            # players are listed best first, so rank is the order within the position
+            ranks = np.arange(1, len(rows) + 1)
+            pos_avg = proj[rows[:pos_range]].sum() / pos_range
+            pos_proj = proj[rows]
+            half = pos_range / 2
+
+            offset = np.select(
+                [
+                    # top 3 qbs and tes, top 6 wrs and rbs
+                    ranks <= pos_range / 4,
+                    # top 8 qbs and tes, top 16 wrs and rbs
+                    ranks <= pos_range * (2 / 3),
+                    # top 18 qbs and tes, top 36 wrs and rbs
+                    ranks < pos_range * 1.5,
+                ],
+                [
+                    (pos_proj - pos_avg) + ((half - ranks) * 10),
+                    (pos_proj - pos_avg) + (half - ranks),
+                    ((pos_proj - pos_avg) * 0.8) + ((half - ranks) * 4),
+                ],
+                # bench players
+                ((pos_proj - pos_avg) * 0.8) + ((half - ranks) * 2)
+            )
+
+            # turn value into a more readable number
+            values = (pos_proj + receptions[rows] + offset) / 15
+            # adjust for qbs getting more points than other positions despite being less valuable
+            if position == 'QB':
+                values = values * 0.75
+            # lowest score a player can have is 1
+            self.values[rows] = np.maximum(values, 1.0)
+            self.ranks[rows] = ranks
+
+    # returns team, rest of season rank and trade value for a player, or None if they aren't projected
+    def lookup(self, player):
+        i = self.index.get(NAME_FIXES.get(player, player))
+        if i is None:
+            return None
+        return Projection(self.teams[i], self.positions[i] + str(self.ranks[i]), float(self.values[i]))
+
+
+# reads the numberfire page into columns for a ProjectionTable
+def parse_projections(html):
+    doc = parse(html, ROS_TABLE)
+    player_names = doc.findAll("span", attrs="full")
+    player_cells = doc.findAll("td", attrs="player")
+    fpts = doc.findAll("td", attrs="nf_fp active")
+    receptions = doc.findAll("td", attrs='rec')
+
+    names = []
+    positions = []
+    teams = []
+    points = []
+    recs = []
+    for name, cell, fpt, rec in zip(player_names, player_cells, fpts, receptions):
+        # player cell ends with '(POS, TEAM)'
+        text = cell.text
+        content = text[text.rfind('(') + 1:text.rfind(')')]
+        parts = content.split(',')
+        if len(parts) < 2:
+            continue
+        try:
+            points.append(float(fpt.text.strip()))
+            recs.append(float(rec.text.strip()))
+        except ValueError:
+            continue
+        names.append(name.text.strip())
+        positions.append(parts[0].strip())
+        teams.append(parts[1].strip())
+
+    return ProjectionTable(names, positions, teams, points, recs)
+
+
+class RosProjections:
+    async def get_table(self):
+        return await pages.parsed(ROS_URL, parse_projections)
+
+
+ros_projections = RosProjections()
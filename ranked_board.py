@@ -0,0 +1,40 @@
+# draft board ordered by rank, any size
+# backed by a python list: a lookup, swap or page is O(1) per player shown, and a move is one memmove of
+# pointers, which bench_draftboard.py shows is still well under a microsecond at dynasty board sizes
+class RankedBoard:
+    __slots__ = ('players',)
+
+    def __init__(self, players=()):
+        self.players = list(players)
+
+    def __len__(self):
+        return len(self.players)
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self.players):
+            raise IndexError('draft board index out of range')
+        return self.players[index]
+
+    def __iter__(self):
+        return iter(self.players)
+
+    # the players shown on one page, as (index, player) pairs
+    def page(self, start, count):
+        return list(enumerate(self.players[start:start + count], start))
+
+    def swap(self, first, second):
+        players = self.players
+        players[first], players[second] = players[second], players[first]
+
+    # takes the player at source out of the board and puts them back in at target
+    def move(self, source, target):
+        if not 0 <= source < len(self.players) or not 0 <= target < len(self.players):
+            raise IndexError('draft board index out of range')
+        self.players.insert(target, self.players.pop(source))
+
+    # puts the board in a new order all at once, players has to hold the same players as the board
+    def reorder(self, players):
+        players = list(players)
+        if len(players) != len(self.players):
+            raise ValueError('a reordered draft board has to keep every player')
+        self.players = players
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from discord.ext import tasks
+from page_cache import pages, SOURCES
+from projections import ros_projections, ROS_URL
+from season_stats import season_stats, SEASON_STATS_URL, CURRENT_SEASON, STAT_NAMES
+from weekly_projections import boom_bust_url, parse_weekly_projections, parse_boom_bust
+
+NEWS_URL = "https://www.fantasypros.com/nfl/breaking-news.php"
+TRENDS_URL = "https://fantasy.nfl.com/research/trends"
+
+
+
+# pages kept warm from startup whether or not anyone has asked for them yet
+# weekly projection pages depend on the week asked for, so those are only kept warm once someone has requested them
+WARM_URLS = {
+    'news': [NEWS_URL],
+    'trends': [TRENDS_URL],
+    'ros_projections': [ROS_URL],
+    'season_stats': [SEASON_STATS_URL.format(position=position, year=CURRENT_SEASON) for position in STAT_NAMES],
+    'boom_bust': [boom_bust_url(position) for position in ('qb', 'rb', 'wr', 'te')],
+    'projections': [],
+}
+
+
+async def prepare_ros_projections(urls):
+    await ros_projections.get_table()
+
+
+async def prepare_season_stats(urls):
+    await asyncio.gather(*(season_stats.get_table(position, CURRENT_SEASON) for position in STAT_NAMES))
+
+
+async def prepare_projections(urls):
+    await asyncio.gather(*(pages.parsed(url, parse_weekly_projections) for url in urls))
+
+
+async def prepare_boom_bust(urls):
+    await asyncio.gather(*(pages.parsed(url, parse_boom_bust) for url in urls))
+
+
+# refreshes every source on its own cadence (its ttl in SOURCES) so commands are served from memory
+# a refresh downloads the source's warm pages plus any of its pages already in the cache, then runs the source's
+# preparers so the parsed structures are rebuilt here instead of in the first command that needs them
+# commands still go through the page cache, so a cold or flushed source is fetched on demand as before
+class RefreshScheduler:
+    def __init__(self):
+        self.loops = {}
+        self.preparers = {
+            'ros_projections': [prepare_ros_projections],
+            'season_stats': [prepare_season_stats],
+            'projections': [prepare_projections],
+            'boom_bust': [prepare_boom_bust],
+        }
+        self.last_refresh = {}
+        self.failures = {}
+
+    # preparer is an async function called with the source's refreshed urls after every refresh
+    def prepare(self, source, preparer):
+        self.preparers.setdefault(source, []).append(preparer)
+
+    def start(self):
+        for source, (_, ttl) in SOURCES.items():
+            if source not in self.loops:
+                self.loops[source] = tasks.loop(seconds=ttl)(self.refresher(source))
+                self.loops[source].start()
+
+    def stop(self):
+        for loop in self.loops.values():
+            loop.cancel()
+        self.loops.clear()
+
+    def refresher(self, source):
+        async def refresh():
+            await self.refresh_source(source)
+        return refresh
+
+    async def refresh_source(self, source):
+        urls = list(dict.fromkeys(WARM_URLS.get(source, []) + pages.urls(source)))
+        results = await asyncio.gather(*(pages.refresh(url) for url in urls), return_exceptions=True)
+        # a failed download keeps the previous copy in the cache, so only the pages that did download get prepared
+        refreshed = [url for url, result in zip(urls, results) if not isinstance(result, BaseException)]
+        self.failures[source] = len(urls) - len(refreshed)
+
+        for preparer in self.preparers.get(source, []) if refreshed else []:
+            try:
+                await preparer(refreshed)
+            except Exception as e:
+                print(f"Failed to prepare {source}: {e}")
+        self.last_refresh[source] = time.time()
+
+    # seconds since each source last finished refreshing, None if it hasn't yet
+    def ages(self):
+        now = time.time()
+        return {source: now - self.last_refresh[source] if source in self.last_refresh else None for source in SOURCES}
+
+
+scheduler = RefreshScheduler()
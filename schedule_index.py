@@ -0,0 +1,58 @@
+import re
+from collections import namedtuple
+
+# abbreviations the scraped sites use that differ from the schedule's
+TEAM_ALIASES = {'JAC': 'JAX'}
+
+Game = namedtuple('Game', ['home_team', 'away_team', 'time', 'date', 'week'])
+
+
+# the schedule's abbreviation for a team, whichever site it came from
+def canonical_team(team):
+    team = (team or '').strip().upper()
+    return TEAM_ALIASES.get(team, team)
+
+
+# week number from 'Week 3', '3' or 3, None for anything else (get_schedule.py pads the table with 'trash' rows)
+def week_number(week):
+    digits = re.sub(r"\D", "", str(week))
+    return int(digits) if digits else None
+
+
+# in memory map of (team, week) -> game and each team's bye weeks, built from the schedules table
+class ScheduleIndex:
+    def __init__(self):
+        self.rebuild([])
+
+    # rows are (home, away, time, date, week) in the order they were stored, the whole index is replaced at once
+    def rebuild(self, rows):
+        games = {}
+        for home, away, time, date, week in rows:
+            number = week_number(week)
+            if number is None:
+                continue
+            game = Game(canonical_team(home), canonical_team(away), time, date, number)
+            for team in (game.home_team, game.away_team):
+                games.setdefault((team, number), game)
+
+        # a bye is a week that has games but none for the team
+        weeks = sorted({week for _, week in games})
+        teams = {team for team, _ in games}
+        byes = {team: [week for week in weeks if (team, week) not in games] for team in teams}
+        self.data = (games, byes)
+
+    def __len__(self):
+        return len(self.data[0])
+
+    # the team's game in a week, None if they don't play (bye, or the schedule hasn't been loaded)
+    def game(self, team, week):
+        return self.data[0].get((canonical_team(team), week_number(week)))
+
+    def bye_weeks(self, team):
+        return self.data[1].get(canonical_team(team), [])
+
+    def is_bye(self, team, week):
+        return week_number(week) in self.bye_weeks(team)
+
+
+schedule_index = ScheduleIndex()
@@ -0,0 +1,150 @@
+from collections import namedtuple
+from page_cache import pages
+from parsing import parse, SEASON_TABLE
+from table_extractor import TableExtractor, Column
+
+SEASON_STATS_URL = "https://www.cbssports.com/fantasy/football/stats/{position}/{year}/season/stats/ppr/"
+CURRENT_SEASON = 2024
+LAST_SEASON = CURRENT_SEASON - 1
+
+# stats shown for each position, in the order they are stored (stat1, stat2, ...)
+STAT_NAMES = {
+    'QB': ['Passing Yards', 'Passing TDs', 'Interceptions', 'Rushing Attempts', 'Rushing Yards', 'Rushing TDs'],
+    'RB': ['Rushing Attempts', 'Rushing Yards', 'Total TDs', 'Targets', 'Receptions', 'Receiving Yards'],
+    'WR': ['Targets', 'Receptions', 'Receiving Yards', 'Total TDs', 'Rushing Attempts', 'Rushing Yards'],
+    'TE': ['Targets', 'Catches', 'Receiving Yards', 'Receiving TDs'],
+}
+
+# typed stat columns stored for every season (player_seasons) and the cbssports column (group, column) each is read from
+STAT_FIELDS = {
+    'pass_yards': ('Passing', 'YDS'),
+    'pass_tds': ('Passing', 'TD'),
+    'interceptions': ('Passing', 'INT'),
+    'rush_attempts': ('Rushing', 'ATT'),
+    'rush_yards': ('Rushing', 'YDS'),
+    'rush_tds': ('Rushing', 'TD'),
+    'targets': ('Receiving', 'TGT'),
+    'receptions': ('Receiving', 'REC'),
+    'receiving_yards': ('Receiving', 'YDS'),
+    'receiving_tds': ('Receiving', 'TD'),
+}
+
+# the fields each of a position's STAT_NAMES is made of, a stat with several fields is their sum ('Total TDs')
+POSITION_STATS = {
+    'QB': [['pass_yards'], ['pass_tds'], ['interceptions'], ['rush_attempts'], ['rush_yards'], ['rush_tds']],
+    'RB': [['rush_attempts'], ['rush_yards'], ['rush_tds', 'receiving_tds'], ['targets'], ['receptions'], ['receiving_yards']],
+    'WR': [['targets'], ['receptions'], ['receiving_yards'], ['receiving_tds', 'rush_tds'], ['rush_attempts'], ['rush_yards']],
+    'TE': [['targets'], ['receptions'], ['receiving_yards'], ['receiving_tds']],
+}
+
+# fields holds every STAT_FIELDS value read for the player, stats are those combined into the position's STAT_NAMES
+SeasonRow = namedtuple('SeasonRow', ['name', 'rank', 'team', 'games_played', 'ppg', 'fields', 'stats'])
+
+
+# converts a table cell to an int or float, None when cbssports shows a dash
+def to_number(text):
+    text = text.strip().replace(',', '')
+    if not text or '—' in text:
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return None
+
+
+# formats a parsed stat for an embed
+def display(value):
+    if value is None:
+        return '—'
+    return str(value)
+
+
+# cell converters for the season table
+def cell_number(cell):
+    return to_number(cell.text)
+
+
+def player_text(cell):
+    name = cell.find('span', class_='CellPlayerName--long')
+    return (name or cell).text.strip()
+
+
+def player_name(cell):
+    return player_text(cell).split("\n")[0].strip()
+
+
+def player_team(cell):
+    return player_text(cell)[-3:].strip()
+
+
+# STAT_FIELDS a position's page has
+def position_fields(position):
+    used = {field for fields in POSITION_STATS[position] for field in fields}
+    return [field for field in STAT_FIELDS if field in used]
+
+
+def season_extractor(position):
+    return TableExtractor(f"{position.title()}SeasonRecord", [
+        Column('name', None, 'Player', player_name),
+        Column('team', None, 'Player', player_team),
+        Column('games_played', None, 'GP', cell_number),
+        Column('ppg', 'Fantasy', 'FPPG', cell_number),
+        *[Column(field, *STAT_FIELDS[field], cell_number) for field in position_fields(position)],
+    ])
+
+
+SEASON_EXTRACTORS = {position: season_extractor(position) for position in POSITION_STATS}
+
+
+# adds up a stat's columns, None only when cbssports shows a dash in every one of them
+def total(values):
+    if all(value is None for value in values):
+        return None
+    return sum(value or 0 for value in values)
+
+
+# a position's STAT_NAMES values from stored or parsed fields
+def combine_stats(position, fields):
+    return tuple(total([fields.get(field) for field in parts]) for parts in POSITION_STATS[position])
+
+
+# reads a cbssports season table into rows keyed by player name, raises ValueError if a column the stats need is gone
+def parse_season_table(html, position):
+    doc = parse(html, SEASON_TABLE)
+    table = doc.find('table')
+    if table is None:
+        raise ValueError(f"No {position} stats table found, the page layout may have changed")
+
+    rows = {}
+    for i, record in enumerate(SEASON_EXTRACTORS[position].rows(table)):
+        # first listed entry wins if cbssports ever repeats a name
+        if record.name in rows:
+            continue
+        fields = {field: getattr(record, field) for field in position_fields(position)}
+        rows[record.name] = SeasonRow(
+            name=record.name,
+            rank=position + str(i + 1),
+            team=record.team,
+            games_played=record.games_played,
+            ppg=record.ppg,
+            fields=fields,
+            stats=combine_stats(position, fields)
+        )
+    return rows
+
+
+class SeasonStats:
+    # rows keyed by player name for one position's season table
+    async def get_table(self, position, year):
+        return await pages.parsed(SEASON_STATS_URL.format(position=position, year=year), parse_season_table, position)
+
+    # returns a player's SeasonRow, or None if they aren't in that season's table
+    async def lookup(self, player, position, year=CURRENT_SEASON):
+        table = await self.get_table(position, year)
+        return table.get(player)
+
+
+season_stats = SeasonStats()
@@ -0,0 +1,61 @@
+from collections import namedtuple
+
+# one field of an extracted row: the header it is read from and how its cell is converted
+# group is the heading spanning the column ('Passing', 'Rushing'), None to match the column name under any group
+Column = namedtuple('Column', ['field', 'group', 'name', 'convert'])
+
+
+# first piece of text in a header cell, header cells can hold a tooltip with the full name after the short one
+def header_text(cell):
+    return next(cell.stripped_strings, '')
+
+
+# (group, name) for every column of a table, read from its header rows
+# with two header rows the first one holds groups that span several columns (colspan) of the second
+def header_labels(table):
+    head = table.find('thead')
+    head_rows = head.find_all('tr') if head is not None else table.find_all('tr', limit=1)
+    if not head_rows:
+        return []
+    names = [header_text(cell) for cell in head_rows[-1].find_all(['th', 'td'], recursive=False)]
+    groups = []
+    if len(head_rows) > 1:
+        for cell in head_rows[-2].find_all(['th', 'td'], recursive=False):
+            groups += [header_text(cell)] * int(cell.get('colspan', 1))
+    groups += [''] * (len(names) - len(groups))
+    return list(zip(groups, names))
+
+
+# pulls typed records out of an html table by column name rather than by position
+# headers are matched once per table, then rows are converted in a single pass as they are read
+class TableExtractor:
+    def __init__(self, record_name, columns):
+        self.columns = columns
+        self.Record = namedtuple(record_name, [column.field for column in columns])
+
+    # cell index for each column, raises ValueError naming every column the table no longer has
+    def column_indexes(self, table):
+        labels = [(group.casefold(), name.casefold()) for group, name in header_labels(table)]
+        indexes = []
+        missing = []
+        for column in self.columns:
+            group = column.group.casefold() if column.group is not None else None
+            name = column.name.casefold()
+            index = next((i for i, label in enumerate(labels) if label[1] == name and group in (None, label[0])), None)
+            if index is None:
+                missing.append(f"{column.group} {column.name}" if column.group else column.name)
+            indexes.append(index)
+        if missing:
+            raise ValueError(f"Table is missing column(s) {', '.join(missing)}, the page layout may have changed")
+        return indexes
+
+    # yields a record for each body row, rows too short to hold every column (spacers, ads) are skipped
+    def rows(self, table):
+        indexes = self.column_indexes(table)
+        width = max(indexes) + 1
+        body = table.find('tbody') or table
+        for row in body.find_all('tr', recursive=False):
+            cells = row.find_all('td', recursive=False)
+            if len(cells) < width:
+                continue
+            yield self.Record(*[column.convert(cells[index]) for column, index in zip(self.columns, indexes)])
@@ -0,0 +1,64 @@
+import re
+from collections import namedtuple
+from page_cache import pages
+from parsing import parse, TABLE_ROWS
+from refresh_scheduler import TRENDS_URL
+
+# players shown per page of /waiver_wire_report
+PLAYERS_PER_PAGE = 6
+
+# 'Puka Nacua WR - LAR' followed by whatever else is in the cell
+PLAYER_CELL = re.compile(r"^(.+?)\s+(QB|RB|WR|TE|K|DEF)\s+-\s+([A-Z]{2,3})\b")
+
+TrendingPlayer = namedtuple('TrendingPlayer', ['name', 'position', 'team', 'rostered', 'started'])
+
+
+# every trending player on the page in the order it lists them
+# each row is eight cells: player, (change), rostered %, (change), started %, ...
+def parse_trends(html):
+    doc = parse(html, TABLE_ROWS)
+    players = []
+    for row in doc.findAll("tr"):
+        cells = row.findAll("td")
+        if len(cells) < 5:
+            continue
+        text = ' '.join(cells[0].text.split())
+        match = PLAYER_CELL.match(text)
+        if match:
+            name, position, team = match.groups()
+        elif text.endswith(' DEF'):
+            # team defenses are listed without the ' - TEAM' part
+            name, position, team = text[:-len(' DEF')], 'DEF', ''
+        else:
+            name, position, team = text, '', ''
+        players.append(TrendingPlayer(name, position, team, cells[2].text.strip(), cells[4].text.strip()))
+    return players
+
+
+# all trending players, and the same list split by position, from one parse of the page
+class TrendsSnapshot:
+    def __init__(self, players=()):
+        self.players = tuple(players)
+        self.by_position = {}
+        for player in self.players:
+            self.by_position.setdefault(player.position, []).append(player)
+
+    # (players on the page, page count) for a 1-based page, optionally only one position
+    def page(self, number, position=None):
+        players = self.players if position is None else self.by_position.get(position, [])
+        page_count = max(1, -(-len(players) // PLAYERS_PER_PAGE))
+        start = (number - 1) * PLAYERS_PER_PAGE
+        return players[start:start + PLAYERS_PER_PAGE], page_count
+
+
+# the trends snapshot for the cached trends page
+def trends_snapshot(html):
+    return TrendsSnapshot(parse_trends(html))
+
+
+class WaiverTrends:
+    async def latest(self):
+        return await pages.parsed(TRENDS_URL, trends_snapshot)
+
+
+waiver_trends = WaiverTrends()
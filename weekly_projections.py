@@ -0,0 +1,70 @@
+import re
+from page_cache import pages
+from parsing import parse, TABLE_ROWS
+
+# trailing words of a player's name that look like a team abbreviation but aren't one
+NAME_SUFFIXES = {'II', 'III', 'IV', 'JR', 'SR'}
+
+
+# fantasypros weekly ppr projections for a position (qb, rb, wr, te)
+def projections_url(position, week):
+    return f"https://www.fantasypros.com/nfl/projections/{position}.php?week={week}&scoring=PPR"
+
+
+# boom/bust report for a position (qb report isn't ppr specific)
+def boom_bust_url(position):
+    if position == 'qb':
+        return "https://www.fantasypros.com/nfl/reports/boom-bust-qb.php"
+    return f"https://www.fantasypros.com/nfl/reports/ppr-boom-bust-{position}.php"
+
+
+# a player cell's name: its player link when it has one, otherwise its text without the team abbreviation after the name
+def player_name(cell):
+    link = cell.find('a', class_='player-name') or cell.find('a')
+    if link is not None:
+        return link.get_text(strip=True)
+    words = cell.get_text(' ', strip=True).split()
+    if len(words) > 1 and re.fullmatch(r'[A-Z]{2,3}', words[-1]) and words[-1] not in NAME_SUFFIXES:
+        words = words[:-1]
+    return ' '.join(words)
+
+
+# {name: (team, projected points)} for every row of a weekly projections page
+# the player cell ends with their team and the projected points are the row's last cell, whatever the position's stat columns
+def parse_weekly_projections(html):
+    players = {}
+    for row in parse(html, TABLE_ROWS).find_all('tr'):
+        cells = row.find_all('td', recursive=False)
+        if len(cells) < 2:
+            continue
+        team = cells[0].get_text().strip()[-3:].strip()
+        # a name listed twice keeps its first row
+        players.setdefault(player_name(cells[0]), (team, cells[-1].get_text().strip()))
+    return players
+
+
+# {name: (boom, bust)} for every row of a boom/bust report
+# the player cell is the first one with letters in it, then boom is the first percentage after it and bust the one before the last
+def parse_boom_bust(html):
+    players = {}
+    for row in parse(html, TABLE_ROWS).find_all('tr'):
+        cells = row.find_all('td', recursive=False)
+        texts = [cell.get_text().strip() for cell in cells]
+        name_index = next((i for i, text in enumerate(texts) if any(c.isalpha() for c in text)), None)
+        if name_index is None:
+            continue
+        percentages = [text for text in texts[name_index + 1:] if '%' in text]
+        if not percentages:
+            continue
+        bust = percentages[-2] if len(percentages) > 1 else ''
+        players.setdefault(player_name(cells[name_index]), (percentages[0], bust))
+    return players
+
+
+# a position's projections for a week, parsed off the loop once per download
+async def get_projections(position, week):
+    return await pages.parsed(projections_url(position, week), parse_weekly_projections)
+
+
+async def get_boom_bust(position):
+    return await pages.parsed(boom_bust_url(position), parse_boom_bust)